@@ -0,0 +1,141 @@
+# bench/catalog_io.py
+"""
+Throughput and memory of services/catalog_io.py against a throwaway Postgres.
+
+    BENCH_PG_DSN=postgresql://postgres@localhost:5432/bench python -m bench.catalog_io 1000000
+    python -m bench.catalog_io 100000 --ceiling-mib 150
+
+Uses whatever catalog bench/seed.py left in BENCH_PG_DSN, through the
+bench/pg_postgrest.PgClient stand-in. Steps:
+
+    export_csv / export_parquet   the whole catalog (products + assets) to a zip
+    reimport_parquet              the Parquet export back in (every row matched, none changed)
+    import_new_csv                a generated N-row CSV of new products (about 1 in 1000 invalid)
+
+Each step reports rows/sec and the peak RSS growth over the process RSS
+before the step (sampled every 20 ms). The script exits 1 when a step
+grows RSS past --ceiling-mib. The generated rows are deleted afterwards.
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import psutil
+
+MARKER = "bench-import"  # category of generated rows, for cleanup
+
+
+class PeakRSS:
+    """Samples RSS in a thread while the block runs; .growth_mib is peak minus the starting RSS."""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.proc = psutil.Process()
+
+    def __enter__(self):
+        self.base = self.peak = self.proc.memory_info().rss
+        self._stop = threading.Event()
+        self._t = threading.Thread(target=self._run, daemon=True)
+        self._t.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.proc.memory_info().rss)
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._t.join()
+        self.peak = max(self.peak, self.proc.memory_info().rss)
+        self.growth_mib = (self.peak - self.base) / 2**20
+
+
+def write_csv(path: str, n: int):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["product_name", "manufacturer", "category", "description", "review_status", "source_urls", "active_ingredients"])
+        for i in range(n):
+            status = "pending" if i % 1000 else "bogus"  # ~0.1% invalid rows
+            w.writerow([
+                f"Imported product {i}",
+                f"Manufacturer {(i * 7919) % 500}",
+                MARKER,
+                f"Bulk-imported description {i} " + "lorem ipsum " * 8,
+                status,
+                f"https://example.com/import/{i}, https://example.com/import/{i}/ifu.pdf",
+                "" if i % 3 else "ingredient a, ingredient b",
+            ])
+
+
+def main(argv):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("rows", nargs="?", type=int, default=1_000_000, help="rows in the generated import file")
+    ap.add_argument("--ceiling-mib", type=float, default=200.0)
+    ap.add_argument("--batch-size", type=int, default=1000)
+    args = ap.parse_args(argv[1:])
+
+    dsn = os.getenv("BENCH_PG_DSN")
+    if not dsn:
+        raise RuntimeError("Set BENCH_PG_DSN to a throwaway local Postgres for benchmarks.")
+    import pyarrow.parquet  # noqa: F401  loaded up front: its import (~80 MiB RSS) is not per-row memory
+
+    from bench.pg_postgrest import PgClient
+    from services.catalog_io import export_catalog, import_catalog
+
+    client = PgClient(dsn)
+    results, over = [], []
+
+    def step(name, fn):
+        with PeakRSS() as mem:
+            stats = fn()
+        rows = stats.get("rows", stats.get("products", 0) + stats.get("assets", 0))
+        results.append((name, rows, stats["seconds"], stats["rows_per_sec"], mem.growth_mib, stats))
+        if mem.growth_mib > args.ceiling_mib:
+            over.append(name)
+        client.log.clear()
+        return stats
+
+    with tempfile.TemporaryDirectory(prefix="bench-catalog-io-") as tmp:
+        csv_zip, pq_zip, new_csv = (os.path.join(tmp, n) for n in ("export_csv.zip", "export_parquet.zip", "new.csv"))
+        step("export_csv", lambda: export_catalog(client, csv_zip, "csv", batch_size=args.batch_size))
+        step("export_parquet", lambda: export_catalog(client, pq_zip, "parquet", batch_size=args.batch_size))
+
+        def reimport():
+            with open(pq_zip, "rb") as f:
+                return import_catalog(client, f, pq_zip, batch_size=args.batch_size)
+
+        step("reimport_parquet", reimport)
+
+        t0 = time.perf_counter()
+        write_csv(new_csv, args.rows)
+        print(f"generated {args.rows:,} rows ({os.path.getsize(new_csv) / 2**20:.0f} MiB CSV) in {time.perf_counter() - t0:.1f}s")
+
+        def import_new():
+            with open(new_csv, "rb") as f:
+                return import_catalog(client, f, new_csv, batch_size=args.batch_size)
+
+        try:
+            step("import_new_csv", import_new)
+        finally:
+            with client._conn().cursor() as cur:
+                cur.execute("delete from staging_products where category = %s", (MARKER,))
+
+    print(f"\n{'step':<18} {'rows':>11} {'seconds':>8} {'rows/s':>9} {'peak RSS':>10}  detail")
+    for name, rows, secs, rps, growth, s in results:
+        if "inserted" in s:
+            detail = f"{s['inserted']:,} inserted, {s['updated']:,} updated, {s['unchanged']:,} unchanged, {s['invalid']:,} invalid, {s['failed']:,} failed"
+        else:
+            detail = f"{s['products']:,} products + {s['assets']:,} assets, {s['bytes'] / 2**20:.1f} MiB zip"
+        print(f"{name:<18} {rows:>11,} {secs:>8.1f} {rps:>9,.0f} {'+%.0f MiB' % growth:>10}  {detail}")
+    if over:
+        print(f"\nover the {args.ceiling_mib:.0f} MiB ceiling: {', '.join(over)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,84 @@
+# bench/columnar_stats.py
+"""
+Per-rerun CPU cost of dashboard/browser stats: list-of-dict loops vs a
+categorical pandas frame.
+
+    python -m bench.columnar_stats 100000 1000000
+
+For each size, times the loop style the pages used (sum(1 for ...), Counter,
+list filter + sort + slice) against services.snapshots.to_frame plus
+vectorized value_counts / masks. Frame construction is reported
+separately: it is paid once per snapshot build, the ops on every rerun.
+"""
+import sys
+import time
+import uuid
+from collections import Counter
+
+from services.snapshots import to_frame, value_counts
+
+STATUSES = ["pending", "in_review", "approved", "rejected"]
+SEVERITIES = ["info", "warning", "error"]
+
+
+def _rows(n: int):
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "manufacturer": f"Manufacturer {(i * 7919) % 500}" if i % 50 else None,
+            "review_status": STATUSES[i % 4],
+            "severity": SEVERITIES[i % 3],
+            "completeness_score": i % 101,
+            "updated_at": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}T00:00:{i % 60:02d}",
+        }
+        for i in range(n)
+    ]
+
+
+def _loops(rows):
+    by_status = {s: sum(1 for r in rows if r.get("review_status") == s) for s in STATUSES}
+    warn = sum(1 for r in rows if r.get("severity") == "warning")
+    mf = Counter(r.get("manufacturer") or "—" for r in rows)
+    top = mf.most_common(10)
+    page = sorted(
+        (r for r in rows if r.get("manufacturer") == "Manufacturer 42" and r.get("review_status") == "approved"),
+        key=lambda r: (r["updated_at"], r["id"]),
+        reverse=True,
+    )[:20]
+    return by_status, warn, top, page
+
+
+def _vectorized(df):
+    by_status = value_counts(df, "review_status")
+    warn = int((df["severity"] == "warning").sum())
+    top = list(value_counts(df, "manufacturer").items())[:10]
+    # the snapshot keeps its frame pre-sorted, so a page is mask + head
+    page = df[(df["manufacturer"] == "Manufacturer 42") & (df["review_status"] == "approved")].head(20)
+    return by_status, warn, top, page
+
+
+def _best(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, out
+
+
+def main(argv):
+    sizes = [int(a) for a in argv[1:]] or [100_000, 1_000_000]
+    print(f"{'rows':>10}  {'loops ms':>9}  {'frame build ms':>14}  {'vectorized ms':>13}  {'speedup':>8}  {'frame MiB':>9}")
+    for n in sizes:
+        rows = _rows(n)
+        loop_ms, (status_a, warn_a, top_a, _) = _best(_loops, rows)
+        build_ms, df = _best(lambda: to_frame(rows).sort_values(["updated_at", "id"], ascending=False, ignore_index=True), repeat=1)
+        vec_ms, (status_b, warn_b, top_b, _) = _best(_vectorized, df)
+        assert status_a == {k: status_b.get(k, 0) for k in STATUSES} and warn_a == warn_b
+        assert [c for _, c in top_a] == [c for _, c in top_b]
+        mib = df.memory_usage(deep=True).sum() / 2**20
+        print(f"{n:>10,}  {loop_ms:>9.1f}  {build_ms:>14.1f}  {vec_ms:>13.1f}  {loop_ms / vec_ms:>7.1f}x  {mib:>9.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
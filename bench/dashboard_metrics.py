@@ -0,0 +1,68 @@
+# bench/dashboard_metrics.py
+"""
+Dashboard KPIs: client-side counting vs the dashboard_metrics() RPC.
+
+    BENCH_PG_DSN=... python -m bench.dashboard_metrics 10000 100000 1000000
+
+For each size the tables are re-seeded, then both paths are timed. The legacy path
+pulls the same three unbounded selects the page used to run; the RPC path returns
+only grouped counts, so its latency and payload should stay flat as rows grow.
+"""
+import json
+import statistics
+import sys
+import time
+from collections import Counter
+
+from bench.seed import apply_schema, bench_conn, seed
+
+RUNS = 5
+
+
+def _legacy(cur):
+    cur.execute("SELECT id, review_status, manufacturer, completeness_score FROM staging_products")
+    prod = cur.fetchall()
+    cur.execute("SELECT id, keep_asset, promoted_to_gl FROM staging_assets")
+    assets = cur.fetchall()
+    cur.execute("SELECT id, severity FROM staging_validation_log")
+    alerts = cur.fetchall()
+    Counter(p[1] for p in prod)
+    Counter(p[2] for p in prod)
+    sum(1 for a in assets if a[1])
+    Counter(a[1] for a in alerts)
+    return len(prod) + len(assets) + len(alerts)
+
+
+def _rpc(cur):
+    cur.execute("SELECT dashboard_metrics()")
+    payload = cur.fetchone()[0]
+    return len(json.dumps(payload))
+
+
+def _time(fn, cur):
+    samples, out = [], None
+    for _ in range(RUNS):
+        t0 = time.perf_counter()
+        out = fn(cur)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), out
+
+
+def main(argv):
+    sizes = [int(a) for a in argv[1:]] or [10_000, 100_000]
+    conn = bench_conn()
+    try:
+        print(f"{'rows':>10}  {'legacy ms':>10}  {'rows pulled':>12}  {'rpc ms':>8}  {'rpc bytes':>10}")
+        for n in sizes:
+            apply_schema(conn)
+            seed(conn, n)
+            with conn.cursor() as cur:
+                legacy_ms, pulled = _time(_legacy, cur)
+                rpc_ms, size = _time(_rpc, cur)
+            print(f"{n:>10,}  {legacy_ms:>10.1f}  {pulled:>12,}  {rpc_ms:>8.1f}  {size:>10,}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
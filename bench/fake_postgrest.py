@@ -0,0 +1,139 @@
+# bench/fake_postgrest.py
+"""
+In-memory stand-in for the supabase-py query builder, enough of it to drive the
+services/ helpers without a network. Every execute() is recorded in `client.log`
+as (table, rows_returned) so scripts can show exactly what crossed the wire.
+Like hosted Supabase, no response carries more than `max_rows` rows.
+"""
+import fnmatch
+import re
+from types import SimpleNamespace
+
+
+def _split_top(expr: str):
+    # split "a,b(c,d),e" on top-level commas, respecting parens and quotes
+    out, depth, quoted, cur = [], 0, False, ""
+    for ch in expr:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0 and not quoted:
+            out.append(cur)
+            cur = ""
+        else:
+            cur += ch
+    if cur:
+        out.append(cur)
+    return out
+
+
+def _unquote(v: str) -> str:
+    if len(v) >= 2 and v[0] == v[-1] == '"':
+        return v[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return v
+
+
+def _cmp(op, left, right):
+    if left is None:
+        return False
+    if op == "ilike":
+        return fnmatch.fnmatch(str(left).lower(), right.replace("%", "*").lower())
+    left = str(left)
+    return {
+        "eq": left == right,
+        "neq": left != right,
+        "lt": left < right,
+        "lte": left <= right,
+        "gt": left > right,
+        "gte": left >= right,
+    }[op]
+
+
+def _compile(cond: str):
+    m = re.fullmatch(r"(and|or)\((.*)\)", cond)
+    if m:
+        parts = [_compile(c) for c in _split_top(m.group(2))]
+        agg = all if m.group(1) == "and" else any
+        return lambda row: agg(p(row) for p in parts)
+    col, op, val = cond.split(".", 2)
+    val = _unquote(val)
+    return lambda row: _cmp(op, row.get(col), val)
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self.client, self.table = client, table
+        self.preds, self.orders = [], []
+        self.columns, self.count, self.n = None, None, None
+
+    def select(self, columns="*", count=None, head=None):
+        self.columns = None if columns.strip() == "*" else [c.strip() for c in columns.split(",")]
+        self.count = count
+        self.head = head
+        return self
+
+    def eq(self, col, val):
+        self.preds.append(lambda row: row.get(col) == val)
+        return self
+
+    def _cmp(self, op, col, val):
+        self.preds.append(lambda row: _cmp(op, row.get(col), str(val)))
+        return self
+
+    def gt(self, col, val):
+        return self._cmp("gt", col, val)
+
+    def gte(self, col, val):
+        return self._cmp("gte", col, val)
+
+    def lt(self, col, val):
+        return self._cmp("lt", col, val)
+
+    def lte(self, col, val):
+        return self._cmp("lte", col, val)
+
+    def in_(self, col, vals):
+        vals = set(vals)
+        self.preds.append(lambda row: row.get(col) in vals)
+        return self
+
+    def or_(self, expr):
+        self.preds.append(_compile(f"or({expr})"))
+        return self
+
+    def order(self, col, desc=False):
+        self.orders.append((col, desc))
+        return self
+
+    def limit(self, n):
+        self.n = n
+        return self
+
+    def execute(self):
+        rows = [r for r in self.client.tables[self.table] if all(p(r) for p in self.preds)]
+        total = len(rows) if self.count else None
+        for col, desc in reversed(self.orders):
+            rows.sort(key=lambda r: r.get(col) or "", reverse=desc)
+        if self.n is not None:
+            rows = rows[: self.n]
+        if self.client.max_rows is not None:
+            rows = rows[: self.client.max_rows]
+        if getattr(self, "head", None):
+            rows = []
+        if self.columns:
+            rows = [{c: r.get(c) for c in self.columns} for r in rows]
+        self.client.log.append((self.table, len(rows)))
+        return SimpleNamespace(data=rows, count=total)
+
+
+class FakeClient:
+    def __init__(self, tables, max_rows=1000):
+        self.tables = tables
+        self.max_rows = max_rows
+        self.log = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
@@ -0,0 +1,43 @@
+-- bench/gl_schema.sql
+-- Minimal Global Library tables for benchmarking promotion against a local
+-- Postgres (the bench points GL_PG_DSN at the same throwaway database).
+-- Column names follow the statements in services/promotion.py and services/gl_names.py.
+
+drop table if exists public.document_assets cascade;
+drop table if exists public.products cascade;
+drop table if exists public.categories cascade;
+drop table if exists public.manufacturers cascade;
+
+create table public.manufacturers (
+    id bigserial primary key,
+    name text not null unique
+);
+
+create table public.categories (
+    id bigserial primary key,
+    name text not null unique
+);
+
+create table public.products (
+    id bigserial primary key,
+    name text,
+    manufacturer_id bigint references public.manufacturers(id),
+    category_id bigint references public.categories(id),
+    description text,
+    source_url text,
+    -- 'promote:<staging product id>', see services/promotion.py
+    idempotency_key text unique,
+    created_at timestamptz default now()
+);
+
+create table public.document_assets (
+    id bigserial primary key,
+    product_id bigint references public.products(id) on delete cascade,
+    manufacturer_id bigint references public.manufacturers(id),
+    asset_type text,
+    content_category text,
+    title text,
+    description text,
+    url text,
+    file_size bigint
+);
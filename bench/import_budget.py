@@ -0,0 +1,100 @@
+# bench/import_budget.py
+"""
+Import-time budget for the app's entry points, measured with `python -X importtime`.
+
+    python -m bench.import_budget            # exits 1 when an entry point is over budget
+    python -m bench.import_budget --runs 5
+
+Each entry point is imported in a fresh interpreter with no SUPABASE_* env.
+For pages that is the page's top-level import block only (not the script
+body), after `import streamlit`, which the server has already loaded by the
+time a page runs. An entry point fails when the best of --runs exceeds its
+budget, or when it pulls in a heavy SDK that should load lazily (LAZY) and
+is not listed as allowed for it.
+"""
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MARK = "--import-budget--"
+
+# loaded on first use (sb(), a promotion, a PDF preview, a pandas page), not at import
+LAZY = ("supabase", "postgrest", "pandas", "pyarrow", "psycopg2", "httpx", "pypdfium2")
+
+# entry point -> (budget ms, heavy modules it may import)
+BUDGETS = {
+    "app.py": (20, ()),
+    "pages/Dashboard.py": (40, ()),
+    "pages/Products.py": (500, ("pandas", "pyarrow")),  # services.snapshots; the page body needs pandas anyway
+    "pages/Product_Detail.py": (40, ()),
+    "pages/Performance.py": (500, ("pandas", "pyarrow")),
+    "supabase_client": (20, ()),
+    "services.promotion_jobs": (30, ()),
+    "services.scoring": (100, ("httpx",)),  # services.validators -> link_check
+    "services.startup": (20, ()),
+}
+
+
+def _import_block(entry: str) -> str:
+    if not entry.endswith(".py"):
+        return f"import {entry}"
+    tree = ast.parse((ROOT / entry).read_text(encoding="utf-8"))
+    return "\n".join(ast.unparse(n) for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom)))
+
+
+def measure(entry: str) -> dict:
+    """One fresh interpreter: total ms of the entry's imports, the slowest top-level imports, heavy modules loaded."""
+    code = "\n".join([
+        "import streamlit, sys",
+        f"sys.stderr.write({MARK!r} + '\\n')",
+        _import_block(entry),
+        f"print(','.join(m for m in {LAZY!r} if m in sys.modules))",
+    ])
+    env = {k: v for k, v in os.environ.items() if not k.startswith("SUPABASE_")}
+    env["PYTHONPATH"] = str(ROOT)
+    p = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    if p.returncode:
+        raise RuntimeError(f"{entry}: import failed\n{p.stderr[-2000:]}")
+    lines = p.stderr.split(MARK, 1)[1].splitlines()
+    top = []
+    for line in lines:
+        m = re.match(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)", line)
+        if m and not m.group(3):  # top level: not imported by another module in this block
+            top.append((int(m.group(2)) / 1000, m.group(4)))
+    return {
+        "ms": sum(ms for ms, _ in top),
+        "slowest": sorted(top, reverse=True)[:3],
+        "heavy": [m for m in p.stdout.strip().split(",") if m],
+    }
+
+
+def main(argv):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("entries", nargs="*", default=list(BUDGETS))
+    ap.add_argument("--runs", type=int, default=3, help="best of N fresh interpreters per entry point")
+    args = ap.parse_args(argv[1:])
+
+    failed = []
+    print(f"{'entry point':<26} {'ms':>7} {'budget':>7}  {'lazy SDKs loaded':<18} slowest imports")
+    for entry in args.entries:
+        budget, allowed = BUDGETS[entry]
+        r = min((measure(entry) for _ in range(args.runs)), key=lambda r: r["ms"])
+        eager = [m for m in r["heavy"] if m not in allowed]
+        ok = r["ms"] <= budget and not eager
+        if not ok:
+            failed.append(entry)
+        slowest = ", ".join(f"{name} {ms:.0f}" for ms, name in r["slowest"])
+        print(f"{entry:<26} {r['ms']:>7.1f} {budget:>7}  {','.join(r['heavy']) or '-':<18} {slowest}{'' if ok else '   FAIL'}")
+    if failed:
+        print(f"\nover budget or eager heavy imports: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
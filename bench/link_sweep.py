@@ -0,0 +1,95 @@
+# bench/link_sweep.py
+"""
+Link checker throughput against a local stub HTTP server.
+
+    python -m bench.link_sweep 20000
+
+The stub (asyncio, keep-alive) answers HEAD with 200 (+ETag), 404, or 405 (HEAD
+rejected, ranged GET allowed), each after a small artificial latency, and honours
+If-None-Match. Runs a cold sweep, a warm sweep (served from the TTL cache) and a
+revalidation sweep (TTL expired, answered with 304s).
+"""
+import asyncio
+import multiprocessing
+import sys
+import time
+
+from services.link_check import LinkCache, check_urls
+
+LATENCY = 0.02
+
+
+async def _handle(reader, writer):
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            method, path, _ = lines[0].split(" ", 2)
+            headers = {k.lower(): v.strip() for k, _, v in (l.partition(":") for l in lines[1:] if l)}
+            await asyncio.sleep(LATENCY)
+
+            kind, etag, body = path.split("/")[1], f'"{path}"', b""
+            if kind == "missing":
+                status = "404 Not Found"
+            elif kind == "nohead" and method == "HEAD":
+                status = "405 Method Not Allowed"
+            elif headers.get("if-none-match") == etag:
+                status = "304 Not Modified"
+            elif method == "GET":
+                status, body = "206 Partial Content", b"%"
+            else:
+                status = "200 OK"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nETag: {etag}\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+                + (body if method == "GET" else b"")
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def _run_stub(conn):
+    async def main():
+        server = await asyncio.start_server(_handle, "0.0.0.0", 0, backlog=2048)
+        conn.send(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def _serve() -> int:
+    # separate process: a stub thread would fight the checker's event loop for the GIL
+    parent, child = multiprocessing.Pipe()
+    multiprocessing.Process(target=_run_stub, args=(child,), daemon=True).start()
+    return parent.recv()
+
+
+def _sweep(label, urls, cache):
+    t0 = time.perf_counter()
+    # one local stub host: this measures throughput, not the per-host spacing
+    res = check_urls(urls, concurrency=200, per_host=16, per_host_interval=0, cache=cache)
+    dt = time.perf_counter() - t0
+    broken = sum(1 for r in res.values() if not r["ok"])
+    print(f"{label:>12}: {len(res):>7,} urls  {broken:>6,} broken  {dt:6.2f}s  {len(res) / dt:>9,.0f} urls/s")
+
+
+def main(argv):
+    n = int(argv[1]) if len(argv) > 1 else 5_000
+    port = _serve()
+
+    kinds = ["ok"] * 8 + ["missing", "nohead"]
+    # distinct hostnames that all resolve to the stub, to exercise per-host limits
+    hosts = [f"127.0.0.{h}:{port}" for h in range(1, 9)]
+    urls = [f"http://{hosts[i % len(hosts)]}/{kinds[i % len(kinds)]}/{i}.pdf" for i in range(n)]
+
+    cache = LinkCache(ttl=3600)
+    _sweep("cold", urls, cache)
+    _sweep("cached", urls, cache)
+    cache.ttl = 0
+    _sweep("revalidate", urls, cache)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
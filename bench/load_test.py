@@ -0,0 +1,280 @@
+# bench/load_test.py
+"""
+Load test for the curation app: seed, drive the pages headlessly, store results.
+
+    BENCH_PG_DSN=postgresql://postgres@localhost:5432/bench python -m bench.load_test 10000 100000 1000000
+    python -m bench.load_test 100000 --reruns 41 --no-seed     # reuse the last seed
+
+For each catalog size the throwaway database is re-seeded (bench/seed.py plus
+bench/gl_schema.sql for the Global Library tables). The page scripts are then
+run through Streamlit's AppTest against bench/pg_postgrest.PgClient, so every
+query runs as real SQL against the real migrations. The scenarios are:
+
+    catalog_warmup   initial change-feed load + snapshot build (shared by all sessions)
+    dashboard        pages/Dashboard.py, cold run then reruns
+    products_browse  pages/Products.py page 1, then "Next" clicks
+    products_filter  manufacturer filter on the largest manufacturer
+    products_search  a prefix search through rpc('search_products')
+    product_detail   pages/Product_Detail.py for one product
+    promote_product  services.promotion.promote_product, one product per call
+
+Each scenario records the cold first run and, over the warm reruns after it,
+latency p50/p95/max and rows and payload bytes fetched per rerun, plus the
+tracemalloc peak of one extra (untimed) rerun and the process RSS. p95 needs
+at least MIN_P95_SAMPLES warm reruns and is null below that; catalog_warmup
+runs once and only has a first run. Results are appended to bench/results/load_test.jsonl,
+tagged with the git commit. The printed table shows the p50 change against
+the latest run from a different commit.
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import psutil
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS = ROOT / "bench" / "results" / "load_test.jsonl"
+# fewer warm samples than this make the nearest-rank p95 the max
+MIN_P95_SAMPLES = 20
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+class Probe:
+    """Per-rerun latency and rows/bytes (from the stand-in's request log); memory from one extra traced step."""
+
+    def __init__(self, client):
+        self.client = client
+        self.ms, self.rows, self.bytes = [], [], []
+        self.peak_kib = 0
+
+    def step(self, fn, *args):
+        mark = len(self.client.log)
+        t0 = time.perf_counter()
+        fn(*args)
+        self.ms.append((time.perf_counter() - t0) * 1000)
+        calls = self.client.log[mark:]
+        self.rows.append(sum(c[1] for c in calls))
+        self.bytes.append(sum(c[2] for c in calls))
+
+    def traced(self, fn, *args):
+        # tracemalloc slows every allocation, so it only runs for this one extra step
+        tracemalloc.start()
+        try:
+            fn(*args)
+            self.peak_kib = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+
+    def result(self) -> dict:
+        # the cold run is reported on its own; percentiles cover the warm reruns
+        warm = sorted(self.ms[1:])
+        rows, nbytes = (self.rows[1:], self.bytes[1:]) if warm else (self.rows, self.bytes)
+        return {
+            "reruns": len(warm),
+            "first_ms": round(self.ms[0], 1),
+            "p50_ms": round(statistics.median(warm), 1) if warm else None,
+            "p95_ms": round(warm[math.ceil(0.95 * len(warm)) - 1], 1) if len(warm) >= MIN_P95_SAMPLES else None,
+            "max_ms": round(warm[-1], 1) if warm else None,
+            "rows_per_rerun": round(statistics.mean(rows), 1),
+            "bytes_per_rerun": round(statistics.mean(nbytes)),
+            "peak_alloc_kib": round(self.peak_kib),
+            "rss_mib": round(psutil.Process().memory_info().rss / 2**20, 1),
+        }
+
+
+def _reset_app_state():
+    # process-wide caches would otherwise carry over from the previous catalog size
+    import streamlit as st
+    from services.change_feed import change_feed
+    from services.snapshots import catalog_snapshots
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    if change_feed.cache_info().currsize:
+        change_feed().stop()
+    change_feed.cache_clear()
+    catalog_snapshots.cache_clear()
+
+
+def _scenarios(client):
+    """name -> (setup() -> state, step(state, i)); step 0 is the cold run."""
+    from streamlit.testing.v1 import AppTest
+
+    from services.promotion import promote_product
+    from services.snapshots import catalog_snapshots
+
+    def page(name, **session):
+        def setup():
+            at = AppTest.from_file(str(ROOT / "pages" / name), default_timeout=600)
+            for k, v in session.items():
+                at.session_state[k] = v
+            return at
+        return setup
+
+    def checked(at, scenario):
+        if at.exception:
+            raise RuntimeError(f"{scenario}: {at.exception[0].value}")
+
+    def click_next(at):
+        return next(b for b in at.button if b.label == "Next ▶").click()
+
+    def warmup(_, i):
+        snaps = catalog_snapshots()
+        snaps.wait_ready(client)
+        for snap in (snaps.products, snaps.assets):
+            if snap.ready:
+                snap.frame()
+
+    def dashboard(at, i):
+        at.run()
+        checked(at, "dashboard")
+
+    def browse(at, i):
+        (click_next(at) if i else at).run()
+        checked(at, "products_browse")
+
+    top = client.rpc("manufacturer_ranking", {"p_limit": 1, "p_status": None}).execute().data[0]["manufacturer"]
+
+    def filtered(at, i):
+        if i == 0:
+            at.run()
+            at.selectbox[0].set_value(top)
+        else:
+            click_next(at)
+        at.run()
+        checked(at, "products_filter")
+
+    def search(at, i):
+        if i == 0:
+            at.run()
+        at.text_input[0].input(f"product {12 + i}").run()
+        checked(at, "products_search")
+
+    def promote(ids, i):
+        ok, msg = promote_product(client, ids[i], promoted_by="bench")
+        if not ok:
+            raise RuntimeError(f"promote_product: {msg}")
+
+    pid = client.table("staging_products").select("id").order("updated_at", desc=True).limit(1).execute().data[0]["id"]
+    approved = lambda: [
+        r["id"]
+        for r in client.table("staging_products").select("id").eq("review_status", "approved").eq("promoted_to_gl", False).limit(100).execute().data
+    ]
+    return {
+        # first, so the feed's initial load is not charged to whichever page starts it
+        "catalog_warmup": (lambda: None, warmup),
+        "dashboard": (page("Dashboard.py"), dashboard),
+        "products_browse": (page("Products.py"), browse),
+        "products_filter": (page("Products.py"), filtered),
+        "products_search": (page("Products.py"), search),
+        "product_detail": (page("Product_Detail.py", selected_product_id=pid), dashboard),
+        "promote_product": (approved, promote),
+    }
+
+
+# scenarios whose work happens once per process; reruns would time no-ops
+ONE_SHOT = {"catalog_warmup"}
+
+
+def run_size(client, reruns: int) -> dict:
+    out = {}
+    for name, (setup, step) in _scenarios(client).items():
+        probe = Probe(client)
+        state = setup()
+        steps = 1 if name in ONE_SHOT else reruns
+        for i in range(steps):
+            probe.step(step, state, i)
+        if name not in ONE_SHOT:
+            probe.traced(step, state, steps)
+        out[name] = probe.result()
+    from services.snapshots import catalog_snapshots
+
+    out["catalog_warmup"]["snapshot_mib"] = round(catalog_snapshots().stats()["memory_bytes"] / 2**20, 1)
+    return out
+
+
+def _previous(commit: str) -> dict:
+    prev = {}
+    if RESULTS.exists():
+        for line in RESULTS.read_text(encoding="utf-8").splitlines():
+            r = json.loads(line)
+            if r.get("commit") != commit:
+                prev[(r["size"], r["scenario"])] = r
+    return prev
+
+
+def main(argv):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("sizes", nargs="*", type=int, default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--reruns", type=int, default=1 + MIN_P95_SAMPLES, help="runs per scenario, the cold one included")
+    ap.add_argument("--no-seed", action="store_true", help="reuse the rows already in BENCH_PG_DSN (single size)")
+    args = ap.parse_args(argv[1:])
+
+    dsn = os.getenv("BENCH_PG_DSN")
+    if not dsn:
+        raise RuntimeError("Set BENCH_PG_DSN to a throwaway local Postgres for benchmarks.")
+    # the app reads these at import / first use; GL writes go to the same throwaway database
+    os.environ.setdefault("SUPABASE_URL", "http://bench.invalid")
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+    os.environ["GL_PG_DSN"] = dsn
+    os.environ.setdefault("CHANGE_FEED_INTERVAL", "3600")  # one load per size, no background polls mid-run
+
+    sys.path.insert(0, str(ROOT))
+    import supabase_client
+
+    from bench.pg_postgrest import PgClient
+    from bench.seed import apply_schema, bench_conn, seed
+
+    client = PgClient(dsn)
+    supabase_client.sb = lambda: client  # pages, feeds and services all go through the stand-in
+
+    commit, prev = _commit(), _previous(_commit())
+    RESULTS.parent.mkdir(parents=True, exist_ok=True)
+
+    print(f"{'size':>9}  {'scenario':<16} {'first':>8} {'p50':>8} {'p95':>8} {'max':>8} {'rows/run':>9} {'KB/run':>8} {'peak KiB':>9} {'RSS MiB':>8}  {'p50 vs prev':>11}")
+    for n in args.sizes:
+        if not args.no_seed:
+            t0 = time.perf_counter()
+            conn = bench_conn()
+            try:
+                apply_schema(conn)
+                with conn.cursor() as cur:
+                    cur.execute((ROOT / "bench" / "gl_schema.sql").read_text(encoding="utf-8"))
+                conn.commit()
+                seed(conn, n)
+            finally:
+                conn.close()
+            print(f"seeded {n:,} products in {time.perf_counter() - t0:.1f}s")
+
+        _reset_app_state()
+        results = run_size(client, args.reruns)
+        with RESULTS.open("a", encoding="utf-8") as f:
+            for scenario, r in results.items():
+                row = {"ts": datetime.now(timezone.utc).isoformat(), "commit": commit, "size": n, "scenario": scenario, **r}
+                f.write(json.dumps(row) + "\n")
+                before = prev.get((n, scenario))
+                delta = f"{(r['p50_ms'] / before['p50_ms'] - 1):+.0%}" if r["p50_ms"] and before and before.get("p50_ms") else "—"
+                p50, p95, mx = (f"{r[k]:>8.1f}" if r[k] is not None else f"{'—':>8}" for k in ("p50_ms", "p95_ms", "max_ms"))
+                print(
+                    f"{n:>9,}  {scenario:<16} {r['first_ms']:>8.1f} {p50} {p95} {mx} "
+                    f"{r['rows_per_rerun']:>9,.0f} {r['bytes_per_rerun'] / 1024:>8.1f} {r['peak_alloc_kib']:>9,} {r['rss_mib']:>8.1f}  {delta:>11}"
+                )
+    print(f"\nresults appended to {RESULTS.relative_to(ROOT)} (commit {commit})")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,291 @@
+# bench/pg_postgrest.py
+"""
+PostgREST stand-in over a real Postgres, for load tests.
+
+Implements the slice of the supabase-py builder the app uses (select with
+count/head, eq/neq/gt/gte/lt/lte/in_/is_/ilike/or_/not_, order, limit,
+single, insert/update/upsert/delete, rpc) by translating each request into
+one SQL statement. Results are serialized by Postgres (json_agg / to_json)
+just as PostgREST does, so row shapes, timestamp formats and payload sizes
+match the real API. Every execute() is logged in `client.log` as
+(target, rows, payload_bytes). Like hosted Supabase, selects and set-returning
+RPCs return at most `max_rows` rows (PostgREST db-max-rows), silently.
+
+    client = PgClient(os.environ["BENCH_PG_DSN"])
+    client.table("staging_products").select("id").eq("review_status", "approved").limit(5).execute()
+"""
+import json
+import re
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import Json
+
+from bench.fake_postgrest import _split_top, _unquote
+
+_OPS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "like": "like", "ilike": "ilike"}
+
+
+def _col(name: str) -> sql.Composable:
+    return sql.Identifier(name.strip())
+
+
+def _or_expr(expr: str) -> sql.Composable:
+    # PostgREST logic tree: "a.eq.1,and(b.gt.2,c.lt.3)"
+    m = re.fullmatch(r"(and|or)\((.*)\)", expr)
+    if m:
+        parts = [_or_expr(c) for c in _split_top(m.group(2))]
+        return sql.SQL("(") + sql.SQL(f" {m.group(1)} ").join(parts) + sql.SQL(")")
+    col, op, val = expr.split(".", 2)
+    val = _unquote(val)
+    if op == "is":
+        return sql.SQL("{} is {}").format(_col(col), sql.SQL({"null": "null", "true": "true", "false": "false"}[val]))
+    return sql.SQL("{} {} {}").format(_col(col), sql.SQL(_OPS[op]), sql.Literal(val))
+
+
+class PgQuery:
+    def __init__(self, client: "PgClient", table: str):
+        self.client = client
+        self.table = table
+        self.verb = "select"
+        self.columns = "*"
+        self.payload: Any = None
+        self.on_conflict: Optional[str] = None
+        self.ignore_duplicates = False
+        self.count: Optional[str] = None
+        self.head = False
+        self.where: List[sql.Composable] = []
+        self.orders: List[sql.Composable] = []
+        self.n: Optional[int] = None
+        self.is_single = False
+        self._negate = False
+
+    # ── verbs ────────────────────────────────────────────────────────────────
+    def select(self, *columns, count=None, head=None):
+        self.columns = ",".join(columns) if columns else "*"
+        self.count, self.head = count, bool(head)
+        return self
+
+    def insert(self, rows, **_):
+        self.verb, self.payload = "insert", rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict: Optional[str] = None, ignore_duplicates: bool = False, **_):
+        self.verb, self.payload = "upsert", rows if isinstance(rows, list) else [rows]
+        self.on_conflict, self.ignore_duplicates = on_conflict or "id", ignore_duplicates
+        return self
+
+    def update(self, fields: Dict[str, Any], **_):
+        self.verb, self.payload = "update", fields
+        return self
+
+    def delete(self, **_):
+        self.verb = "delete"
+        return self
+
+    # ── filters ──────────────────────────────────────────────────────────────
+    @property
+    def not_(self):
+        self._negate = True
+        return self
+
+    def _filter(self, cond: sql.Composable):
+        if self._negate:
+            cond, self._negate = sql.SQL("not ({})").format(cond), False
+        self.where.append(cond)
+        return self
+
+    def _op(self, op: str, col: str, val):
+        return self._filter(sql.SQL("{} {} {}").format(_col(col), sql.SQL(_OPS[op]), sql.Literal(val)))
+
+    def eq(self, col, val):
+        return self._op("eq", col, val)
+
+    def neq(self, col, val):
+        return self._op("neq", col, val)
+
+    def gt(self, col, val):
+        return self._op("gt", col, val)
+
+    def gte(self, col, val):
+        return self._op("gte", col, val)
+
+    def lt(self, col, val):
+        return self._op("lt", col, val)
+
+    def lte(self, col, val):
+        return self._op("lte", col, val)
+
+    def ilike(self, col, pattern):
+        return self._op("ilike", col, pattern)
+
+    def is_(self, col, val):
+        word = {None: "null", "null": "null", True: "true", "true": "true", False: "false", "false": "false"}[val]
+        return self._filter(sql.SQL("{} is {}").format(_col(col), sql.SQL(word)))
+
+    def in_(self, col, vals):
+        vals = list(vals)
+        if not vals:
+            return self._filter(sql.SQL("false"))
+        return self._filter(sql.SQL("{} in ({})").format(_col(col), sql.SQL(", ").join(sql.Literal(v) for v in vals)))
+
+    def or_(self, expr: str):
+        return self._filter(_or_expr(f"or({expr})"))
+
+    # ── modifiers ────────────────────────────────────────────────────────────
+    def order(self, col, desc=False, nullsfirst=None):
+        self.orders.append(sql.SQL("{} {}").format(_col(col), sql.SQL("desc" if desc else "asc")))
+        return self
+
+    def limit(self, n):
+        self.n = int(n)
+        return self
+
+    def single(self):
+        self.is_single = True
+        return self
+
+    # ── execution ────────────────────────────────────────────────────────────
+    def _where(self) -> sql.Composable:
+        return sql.SQL(" where ") + sql.SQL(" and ").join(self.where) if self.where else sql.SQL("")
+
+    def _statement(self) -> sql.Composable:
+        t = sql.Identifier(self.table)
+        where = self._where()
+        if self.verb == "select":
+            cols = sql.SQL("*") if self.columns.strip() == "*" else sql.SQL(", ").join(_col(c) for c in self.columns.split(","))
+            stmt = sql.SQL("select {} from {}{}").format(cols, t, where)
+            if self.orders:
+                stmt += sql.SQL(" order by ") + sql.SQL(", ").join(self.orders)
+            limits = [n for n in (self.n, self.client.max_rows) if n is not None]
+            if limits:
+                stmt += sql.SQL(" limit {}").format(sql.Literal(min(limits)))
+            return stmt
+        if self.verb in ("insert", "upsert"):
+            keys = list(dict.fromkeys(k for r in self.payload for k in r))
+            cols = sql.SQL(", ").join(_col(k) for k in keys)
+            stmt = sql.SQL("insert into {t} ({cols}) select {cols} from jsonb_populate_recordset(null::{t}, {rows})").format(
+                t=t, cols=cols, rows=sql.Literal(Json(self.payload))
+            )
+            if self.verb == "upsert":
+                target = sql.SQL(", ").join(_col(c) for c in self.on_conflict.split(","))
+                if self.ignore_duplicates:
+                    stmt += sql.SQL(" on conflict ({}) do nothing").format(target)
+                else:
+                    sets = sql.SQL(", ").join(sql.SQL("{0} = excluded.{0}").format(_col(k)) for k in keys)
+                    stmt += sql.SQL(" on conflict ({}) do update set {}").format(target, sets)
+            return stmt + sql.SQL(" returning *")
+        if self.verb == "update":
+            keys = list(self.payload)
+            cols = sql.SQL(", ").join(_col(k) for k in keys)
+            return sql.SQL("update {t} set ({cols}) = (select {cols} from jsonb_populate_record(null::{t}, {row})){where} returning *").format(
+                t=t, cols=cols, row=sql.Literal(Json(self.payload)), where=where
+            )
+        return sql.SQL("delete from {}{} returning *").format(t, where)
+
+    def execute(self):
+        count = None
+        if self.verb == "select" and self.count:
+            count = self.client._count(sql.SQL("from {}{}").format(sql.Identifier(self.table), self._where()), self.count)
+        if self.verb == "select" and self.head:
+            self.client.log.append((self.table, 0, 0))
+            return SimpleNamespace(data=[], count=count)
+        data = self.client._json(sql.SQL("with r as ({}) select coalesce(json_agg(r), '[]')::text from r").format(self._statement()), self.table)
+        if self.is_single:
+            if len(data) != 1:
+                raise RuntimeError(f"JSON object requested, multiple (or no) rows returned ({len(data)})")
+            data = data[0]
+        return SimpleNamespace(data=data, count=count)
+
+
+class _Rpc:
+    def __init__(self, client: "PgClient", fn: str, params: Optional[dict]):
+        self.client, self.fn, self.params = client, fn, params or {}
+        self.is_single = False
+
+    def single(self):
+        self.is_single = True
+        return self
+
+    def execute(self):
+        retset, types = self.client._signature(self.fn)
+        args = []
+        for k, v in self.params.items():
+            typ = types.get(k, "text")
+            if typ in ("json", "jsonb"):
+                val = sql.Literal(Json(v))
+            else:
+                val = sql.SQL("{}::{}").format(sql.Literal(v), sql.SQL(typ))
+            args.append(sql.SQL("{} := {}").format(sql.Identifier(k), val))
+        call = sql.SQL("{}({})").format(sql.Identifier(self.fn), sql.SQL(", ").join(args))
+        if retset:
+            limit = sql.SQL(" limit {}").format(sql.Literal(self.client.max_rows)) if self.client.max_rows is not None else sql.SQL("")
+            q = sql.SQL("select coalesce(json_agg(r), '[]')::text from (select * from {}{}) r").format(call, limit)
+        else:
+            q = sql.SQL("select to_json({})::text").format(call)
+        data = self.client._json(q, "rpc:" + self.fn)
+        return SimpleNamespace(data=data, count=None)
+
+
+class PgClient:
+    """supabase-py shaped client; one autocommit connection per thread, like PostgREST's per-request transactions."""
+
+    def __init__(self, dsn: str, max_rows: Optional[int] = 1000):
+        self.dsn = dsn
+        self.max_rows = max_rows
+        self.log: List[tuple] = []
+        self._local = threading.local()
+        self._signatures: Dict[str, tuple] = {}
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or conn.closed:
+            conn = psycopg2.connect(self.dsn)
+            conn.autocommit = True
+            self._local.conn = conn
+        return conn
+
+    def _json(self, query: sql.Composable, target: str):
+        with self._conn().cursor() as cur:
+            # queries end in ::text, so the payload is exactly what Postgres serialized (what PostgREST would send)
+            cur.execute(query)
+            text = cur.fetchone()[0]
+        data = json.loads(text) if text is not None else None
+        self.log.append((target, len(data) if isinstance(data, list) else int(data is not None), len(text or "")))
+        return data
+
+    def _count(self, from_where: sql.Composable, mode: str) -> int:
+        with self._conn().cursor() as cur:
+            if mode == "exact":
+                cur.execute(sql.SQL("select count(*) ") + from_where)
+                return cur.fetchone()[0]
+            # planned / estimated: the planner's row estimate, as PostgREST reports it
+            cur.execute(sql.SQL("explain (format json) select 1 ") + from_where)
+            return int(cur.fetchone()[0][0]["Plan"]["Plan Rows"])
+
+    def _signature(self, fn: str):
+        if fn not in self._signatures:
+            with self._conn().cursor() as cur:
+                cur.execute(
+                    "select p.proretset, pg_get_function_identity_arguments(p.oid) from pg_proc p "
+                    "join pg_namespace n on n.oid = p.pronamespace where n.nspname = 'public' and p.proname = %s",
+                    (fn,),
+                )
+                row = cur.fetchone()
+            if row is None:
+                raise RuntimeError(f"function public.{fn} does not exist")
+            types = {}
+            for arg in filter(None, (a.strip() for a in row[1].split(", "))):
+                name, typ = arg.split(" ", 1)
+                types[name] = typ
+            self._signatures[fn] = (row[0], types)
+        return self._signatures[fn]
+
+    def table(self, name: str) -> PgQuery:
+        return PgQuery(self, name)
+
+    def rpc(self, fn: str, params: Optional[dict] = None, **_) -> _Rpc:
+        return _Rpc(self, fn, params)
@@ -0,0 +1,62 @@
+# bench/products_paging.py
+"""
+Rows transferred per page: legacy fetch-all-then-slice vs keyset paging.
+
+    python -m bench.products_paging 100000
+
+Runs against bench.fake_postgrest, so no database is needed. Each page of the
+keyset path is one request returning page_size + 1 rows regardless of depth.
+"""
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from bench.fake_postgrest import FakeClient
+from services.products import LIST_COLUMNS, product_page
+
+PAGE_SIZE = 20
+PAGES = 5
+
+
+def _catalog(n: int):
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "product_name": f"Product {i}",
+            "manufacturer": f"Manufacturer {i % 300}",
+            "review_status": ["pending", "in_review", "approved", "rejected"][i % 4],
+            # a few identical timestamps to exercise the id tie-breaker
+            "updated_at": (now - timedelta(seconds=i // 3)).isoformat(),
+        }
+        for i in range(n)
+    ]
+
+
+def main(argv):
+    n = int(argv[1]) if len(argv) > 1 else 100_000
+    # no max-rows, so the legacy fetch-all shows what it asks for
+    client = FakeClient({"staging_products": _catalog(n)}, max_rows=None)
+
+    print(f"catalog: {n:,} rows, page size {PAGE_SIZE}\n")
+    print(f"{'page':>5}  {'legacy rows':>12}  {'keyset rows':>12}  {'requests':>9}")
+
+    after, seen = None, set()
+    for page in range(1, PAGES + 1):
+        client.log.clear()
+        client.table("staging_products").select(LIST_COLUMNS).order("updated_at", desc=True).execute()
+        legacy = sum(r for _, r in client.log)
+
+        client.log.clear()
+        res = product_page(client, after=after, page_size=PAGE_SIZE)
+        keyset = sum(r for _, r in client.log)
+        ids = {r["id"] for r in res["rows"]}
+        assert not ids & seen, "keyset pages overlap"
+        seen |= ids
+        after = res["next"]
+
+        print(f"{page:>5}  {legacy:>12,}  {keyset:>12,}  {len(client.log):>9}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
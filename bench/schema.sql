@@ -0,0 +1,74 @@
+-- bench/schema.sql
+-- Minimal stand-in for the Supabase staging schema, used only by the bench/ scripts
+-- against a throwaway local Postgres. Columns mirror what the app reads and writes.
+-- Tables only: indexes, functions and later columns come from sql/, which
+-- bench/seed.apply_schema runs after this file, so benchmarks see the deployed schema.
+
+create extension if not exists pgcrypto;
+
+drop table if exists public.staging_validation_log cascade;
+drop table if exists public.staging_promotion_log cascade;
+drop table if exists public.staging_assets cascade;
+drop table if exists public.staging_products cascade;
+
+create table public.staging_products (
+    id uuid primary key default gen_random_uuid(),
+    product_name text,
+    manufacturer text,
+    category text,
+    description text,
+    indications text,
+    contraindications text,
+    regulatory_status text default 'unknown',
+    review_status text default 'pending',
+    completeness_score int default 0,
+    source_urls text[] default '{}',
+    source_page_ids text[] default '{}',
+    active_ingredients text[] default '{}',
+    promoted_to_gl boolean default false,
+    gl_product_id text,
+    promoted_at timestamptz,
+    created_at timestamptz default now(),
+    updated_at timestamptz default now()
+);
+
+create table public.staging_assets (
+    id uuid primary key default gen_random_uuid(),
+    staging_product_id uuid references public.staging_products(id) on delete cascade,
+    asset_type text,
+    content_category text,
+    file_url text,
+    file_name text,
+    file_size_bytes bigint,
+    keep_asset boolean default true,
+    title text,
+    description text,
+    promoted_to_gl boolean default false,
+    gl_asset_id text,
+    created_at timestamptz default now(),
+    updated_at timestamptz default now()
+);
+
+create table public.staging_validation_log (
+    id uuid primary key default gen_random_uuid(),
+    staging_product_id uuid references public.staging_products(id) on delete cascade,
+    severity text,
+    message text,
+    created_at timestamptz default now()
+);
+
+create table public.staging_promotion_log (
+    id uuid primary key default gen_random_uuid(),
+    staging_product_id uuid,
+    gl_product_id text,
+    promoted_by text,
+    assets_promoted_count int,
+    promotion_status text,
+    error_message text,
+    created_at timestamptz default now()
+);
+
+do $$ begin
+    create role service_role;
+exception when duplicate_object then null;
+end $$;
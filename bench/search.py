@@ -0,0 +1,71 @@
+# bench/search.py
+"""
+Product search latency: legacy double ILIKE vs rpc search_products.
+
+    BENCH_PG_DSN=... python -m bench.search 1000000
+
+Seeds `n` products (skip with --no-seed to reuse the current tables), then runs a
+fixed query mix through both paths and prints p50/p95 per path, plus p50 per
+query. Target for the RPC path is < 100 ms p95 at 1M products.
+"""
+import statistics
+import sys
+import time
+
+from bench.seed import apply_schema, bench_conn, seed
+
+QUERIES = ["product 12", "manufacturer 7", "lorem", "prod", "category 3 product", "ipsum dolor", "zzz"]
+RUNS = 5
+LIMIT = 21
+
+
+def _legacy(cur, q):
+    cur.execute(
+        """
+        SELECT id, product_name FROM staging_products
+        WHERE product_name ILIKE %s OR description ILIKE %s
+        ORDER BY updated_at DESC LIMIT %s
+        """,
+        (f"%{q}%", f"%{q}%", LIMIT),
+    )
+    return cur.fetchall()
+
+
+def _rpc(cur, q):
+    cur.execute("SELECT id, product_name, rank FROM search_products(%s, p_limit => %s)", (q, LIMIT))
+    return cur.fetchall()
+
+
+def _pcts(samples):
+    s = sorted(samples)
+    return statistics.median(s), s[max(0, int(len(s) * 0.95) - 1)]
+
+
+def main(argv):
+    args = [a for a in argv[1:] if not a.startswith("--")]
+    n = int(args[0]) if args else 100_000
+    conn = bench_conn()
+    try:
+        if "--no-seed" not in argv:
+            apply_schema(conn)
+            seed(conn, n)
+        with conn.cursor() as cur:
+            for name, fn in (("ilike", _legacy), ("search_products", _rpc)):
+                samples, per_query = [], {}
+                for q in QUERIES:
+                    fn(cur, q)  # warm
+                    for _ in range(RUNS):
+                        t0 = time.perf_counter()
+                        fn(cur, q)
+                        per_query.setdefault(q, []).append((time.perf_counter() - t0) * 1000)
+                    samples.extend(per_query[q])
+                p50, p95 = _pcts(samples)
+                print(f"{name:>16}  p50 {p50:8.1f} ms   p95 {p95:8.1f} ms")
+                for q, ms in per_query.items():
+                    print(f"{'':>16}    {q!r:<22} p50 {statistics.median(ms):8.1f} ms")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
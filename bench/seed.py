@@ -0,0 +1,92 @@
+# bench/seed.py
+"""
+Seed a throwaway local Postgres with synthetic staging data.
+
+    BENCH_PG_DSN=postgresql://postgres@localhost:5432/bench python -m bench.seed 100000
+
+Creates the stand-in schema (bench/schema.sql), applies every sql/*.sql migration
+and generates `n` products with ~3 assets and ~1 validation row each.
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+import psycopg2
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MANUFACTURERS = 300
+STATUSES = ["pending", "in_review", "approved", "rejected"]
+
+
+def bench_conn():
+    dsn = os.getenv("BENCH_PG_DSN")
+    if not dsn:
+        raise RuntimeError("Set BENCH_PG_DSN to a throwaway local Postgres for benchmarks.")
+    return psycopg2.connect(dsn)
+
+
+def apply_schema(conn):
+    files = [ROOT / "bench" / "schema.sql"] + sorted((ROOT / "sql").glob("*.sql"))
+    with conn.cursor() as cur:
+        for f in files:
+            cur.execute(f.read_text(encoding="utf-8"))
+    conn.commit()
+
+
+def seed(conn, n: int):
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO staging_products
+                (product_name, manufacturer, category, description, review_status,
+                 completeness_score, source_urls, updated_at)
+            SELECT 'Product ' || g,
+                   'Manufacturer ' || (power(random(), 2) * %s)::int,
+                   'Category ' || (g %% 25),
+                   repeat('Lorem ipsum dolor sit amet ', 20 + (g %% 20)),
+                   (%s::text[])[1 + (g %% 4)],
+                   (g %% 100),
+                   ARRAY['https://example.com/p/' || g],
+                   now() - (g || ' seconds')::interval
+            FROM generate_series(1, %s) g
+            """,
+            (MANUFACTURERS, STATUSES, n),
+        )
+        cur.execute(
+            """
+            INSERT INTO staging_assets
+                (staging_product_id, asset_type, content_category, file_url, file_name,
+                 file_size_bytes, keep_asset, promoted_to_gl)
+            SELECT p.id, 'pdf', 'datasheet',
+                   'https://example.com/a/' || p.id || '/' || k || '.pdf',
+                   k || '.pdf', 100000 + k, (k % 3) <> 0, (k % 5) = 0
+            FROM staging_products p, generate_series(1, 3) k
+            """
+        )
+        cur.execute(
+            """
+            INSERT INTO staging_validation_log (staging_product_id, severity, message)
+            SELECT id, CASE WHEN random() < 0.8 THEN 'warning' ELSE 'error' END, 'synthetic'
+            FROM staging_products
+            """
+        )
+        cur.execute("ANALYZE")
+    conn.commit()
+
+
+def main(argv):
+    n = int(argv[1]) if len(argv) > 1 else 10_000
+    conn = bench_conn()
+    try:
+        t0 = time.perf_counter()
+        apply_schema(conn)
+        seed(conn, n)
+        print(f"seeded {n:,} products in {time.perf_counter() - t0:.1f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -1,43 +1,99 @@
 # pages/1_📊_Dashboard.py
+import sys
 import streamlit as st
 from supabase_client import sb
+from services.change_feed import change_feed
+from services.metrics import REVIEW_STATUSES, dashboard_metrics, manufacturer_ranking
+from services.promotion_jobs import queue_counts
+from services.perf import page_done, track_page
 
 st.set_page_config(page_title="Dashboard", page_icon="📊", layout="wide")
 st.title("📊 Dashboard")
+track_page("Dashboard")
 
-client = sb()
 
-# Basic KPIs
-prod = client.table("staging_products").select("id,review_status,manufacturer,completeness_score").execute().data or []
-assets = client.table("staging_assets").select("id,keep_asset,promoted_to_gl").execute().data or []
-alerts = client.table("staging_validation_log").select("id,severity").execute().data or []
+@st.cache_data(ttl=60, max_entries=4, show_spinner=False)
+def _load_metrics(feed_version: int):
+    # grouped counts only — one RPC, constant payload size.
+    # Keyed on the change-feed version: an edit makes the next run miss, once for
+    # every session, instead of each session clearing the shared cache.
+    return dashboard_metrics(sb())
+
+
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
+def _load_ranking(status, feed_version: int):
+    # one cached entry per drill-down and feed version
+    return manufacturer_ranking(sb(), limit=10, status=status)
+
 
-total_products = len(prod)
-approved = sum(1 for p in prod if p.get("review_status")=="approved")
-pending  = sum(1 for p in prod if p.get("review_status")=="pending")
-rejected = sum(1 for p in prod if p.get("review_status")=="rejected")
+@st.fragment(run_every=10)
+def _watch_changes():
+    # the change feed polls in the background; rerun only when it saw edits
+    v = change_feed().version
+    seen = st.session_state.setdefault("dashboard_feed_version", v)
+    if v != seen:
+        st.session_state["dashboard_feed_version"] = v
+        st.rerun()
+
+
+_watch_changes()
+feed_version = st.session_state["dashboard_feed_version"]
+
+# Basic KPIs
+m = _load_metrics(feed_version)
 
 col1, col2, col3, col4 = st.columns(4)
-col1.metric("Total Products", total_products)
-col2.metric("Approved", approved)
-col3.metric("Pending", pending)
-col4.metric("Rejected", rejected)
+col1.metric("Total Products", m["total_products"])
+col2.metric("Approved", m["review_status"]["approved"])
+col3.metric("Pending", m["review_status"]["pending"])
+col4.metric("Rejected", m["review_status"]["rejected"])
 
 st.subheader("Manufacturers (Top 10)")
-from collections import Counter
-mf = Counter([p.get("manufacturer") or "—" for p in prod])
-st.table({"Manufacturer": list(mf.keys())[:10], "Count": list(mf.values())[:10]})
+drill = st.selectbox("Review status", options=["(All)"] + REVIEW_STATUSES, index=0, key="dashboard_rank_status")
+mf = _load_ranking(None if drill == "(All)" else drill, feed_version)
+ranked_total = sum(r["count"] for r in mf) or 1
+st.table({
+    "#": [r["rank"] for r in mf],
+    "Manufacturer": [r["manufacturer"] for r in mf],
+    "Count": [r["count"] for r in mf],
+    "Share": [f"{r['count'] / ranked_total:.1%}" for r in mf],
+})
 
 st.subheader("Asset Summary")
-kept = sum(1 for a in assets if a.get("keep_asset"))
-gl = sum(1 for a in assets if a.get("promoted_to_gl"))
 c1, c2 = st.columns(2)
-c1.metric("Assets (Kept)", kept)
-c2.metric("Assets Promoted", gl)
+c1.metric("Assets (Kept)", m["assets"]["kept"])
+c2.metric("Assets Promoted", m["assets"]["promoted"])
 
 st.subheader("Validation Alerts")
-warn = sum(1 for a in alerts if a.get("severity")=="warning")
-err  = sum(1 for a in alerts if a.get("severity")=="error")
 w1, w2 = st.columns(2)
-w1.metric("Warnings", warn)
-w2.metric("Errors", err)
+w1.metric("Warnings", m["severity"]["warning"])
+w2.metric("Errors", m["severity"]["error"])
+
+st.subheader("Promotion Queue")
+
+
+@st.fragment(run_every=5)
+def _promotion_queue():
+    q = queue_counts(sb())
+    q1, q2, q3, q4 = st.columns(4)
+    q1.metric("Queued", q["queued"])
+    q2.metric("Running", q["running"])
+    q3.metric("Promoted (24h)", q["success"])
+    q4.metric("Failed (24h)", q["failed"])
+
+
+_promotion_queue()
+
+# only shown once this process has promoted something (never opens a connection itself,
+# and does not import the pool module / psycopg2 before a promotion has)
+gl = sys.modules.get("services.gl_pool")
+pool = gl.gl_pool_stats() if gl else None
+if pool:
+    st.subheader("Global Library Connections")
+    p1, p2, p3, p4 = st.columns(4)
+    p1.metric("In use", f"{pool['in_use']} / {pool['max']}")
+    p2.metric("Idle", pool["idle"])
+    p3.metric("Waits", pool["waits"], help=f"avg {pool['avg_wait_ms']:.0f} ms, timeouts {pool['timeouts']}")
+    p4.metric("Connect latency", f"{pool['avg_connect_ms']:.0f} ms", help=f"{pool['connects']} connects, last {pool['last_connect_ms']:.0f} ms")
+
+page_done()
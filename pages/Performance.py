@@ -0,0 +1,77 @@
+# pages/Performance.py
+import pandas as pd
+import streamlit as st
+from services.perf import recorder
+
+st.set_page_config(page_title="Performance", page_icon="⏱️", layout="wide")
+st.title("⏱️ Performance")
+st.caption(
+    "PostgREST queries, GL statements and page runs recorded by this app process "
+    "(services/perf.py). Samples are kept in memory; set PERF_EXPORT_FILE / PERF_OTEL to keep them."
+)
+
+WINDOWS = {"Last 15 minutes": 900, "Last hour": 3600, "Last 6 hours": 6 * 3600}
+c1, c2 = st.columns(2)
+window = WINDOWS[c1.selectbox("Window", options=list(WINDOWS), index=1)]
+kind = c2.selectbox("Source", options=["(All)", "postgrest", "gl"], index=0)
+kind = None if kind == "(All)" else kind
+
+rec = recorder()
+
+# ── Pages ────────────────────────────────────────────────────────────────────
+st.subheader("Page runs")
+pages = rec.summary(window, by=("page",), kind="page")
+if pages:
+    st.dataframe(
+        pd.DataFrame(pages)[["page", "n", "p50_ms", "p95_ms", "p99_ms", "max_ms"]],
+        hide_index=True,
+        use_container_width=True,
+        column_config={c: st.column_config.NumberColumn(c.replace("_ms", " (ms)"), format="%.0f") for c in ("p50_ms", "p95_ms", "p99_ms", "max_ms")},
+    )
+else:
+    st.caption("No page runs recorded yet.")
+
+# query time spent per page, split by source
+queries = [r for r in rec.summary(window, by=("page", "kind")) if r["kind"] != "page" and (not kind or r["kind"] == kind)]
+if queries:
+    st.caption("Query time per page")
+    st.dataframe(
+        pd.DataFrame(queries)[["page", "kind", "n", "p50_ms", "p95_ms", "total_ms"]],
+        hide_index=True,
+        use_container_width=True,
+        column_config={c: st.column_config.NumberColumn(c.replace("_ms", " (ms)"), format="%.0f") for c in ("p50_ms", "p95_ms", "total_ms")},
+    )
+
+# ── Slowest query sites ──────────────────────────────────────────────────────
+st.subheader("Slowest query sites")
+sites = [r for r in rec.summary(window, kind=kind) if r["kind"] != "page"]
+if not sites:
+    st.caption("No queries recorded in this window.")
+else:
+    df = pd.DataFrame(sites[:50])
+    df["KB"] = df["bytes"].map(lambda b: None if b is None or pd.isna(b) else b / 1024)
+    st.dataframe(
+        df[["target", "caller", "kind", "n", "p50_ms", "p95_ms", "p99_ms", "max_ms", "avg_rows", "KB"]],
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "target": "Query",
+            "caller": "Site",
+            **{c: st.column_config.NumberColumn(c.replace("_ms", " (ms)"), format="%.1f") for c in ("p50_ms", "p95_ms", "p99_ms", "max_ms")},
+            "avg_rows": st.column_config.NumberColumn("Rows (avg)", format="%.0f"),
+            "KB": st.column_config.NumberColumn("KB (total)", format="%.1f"),
+        },
+    )
+
+    slow = rec.slowest(window, 20, kind)
+    with st.expander("Slowest individual calls"):
+        st.dataframe(
+            pd.DataFrame(slow)[["ts", "page", "target", "caller", "ms", "rows", "bytes", "error"]].assign(
+                ts=lambda d: pd.to_datetime(d["ts"], unit="s")
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+if st.button("Refresh"):
+    st.rerun()
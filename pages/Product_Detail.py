@@ -1,13 +1,21 @@
 # pages/Product_Detail.py
+import time
 import streamlit as st
 from datetime import datetime, timezone
-from supabase_client import sb
+from supabase_client import sb, session_sb
+from services.assets import CONTENT_CATEGORIES, bulk_update_assets, dirty_rows
+from services.products import id_pages
+from services.promotion_jobs import enqueue_promotions, ensure_inprocess_workers, latest_job
+from utils.pdf import is_pdf_asset, pdf_thumbnail
+from services.perf import page_done, page_rerun, page_stop, track_page
 
 
 st.set_page_config(page_title="Product Editor", layout="wide")
 st.title("✏️ Product Editor")
+track_page("Product Detail")
 
-client = sb()
+# reruns (checkbox toggles, expanders) re-read the product and assets from memory
+client = session_sb()
 
 
 
@@ -29,7 +37,6 @@ FIELD_LABELS = {
     "indications": "Indications",
     "contraindications": "Contraindications",
     "regulatory_status": "Regulatory status",
-    "completeness_score": "Completeness score",
     "source_urls": "Source URLs",
 }
 
@@ -57,15 +64,33 @@ if not pid:
     if opt != "(None)":
         st.session_state["selected_product_id"] = opt
         st.query_params["pid"] = opt
-        st.rerun()
-    st.stop()
+        page_rerun()
+    page_stop()
 
 # --- Load the product ---
-res = client.table("staging_products").select("*").eq("id", pid).single().execute()
-prod = res.data
+# a save hands its returned row to the next rerun, so no read-back is needed
+seed = st.session_state.pop("product_seed", None)
+if seed and str(seed.get("id")) == str(pid):
+    prod = seed
+else:
+    res = client.table("staging_products").select("*").eq("id", pid).single().execute()
+    prod = res.data
 if not prod:
     st.error("Product not found.")
-    st.stop()
+    page_stop()
+
+# --- Result of the last save (shown after the rerun it triggered) ---
+saved = st.session_state.pop("product_saved", None)
+if saved:
+    changed_labels = [FIELD_LABELS.get(k, k) for k in saved.keys()]
+    st.success(f"Saved ✔  Updated: {', '.join(changed_labels)}")
+
+    with st.expander("See details of what changed"):
+        for k, diffv in saved.items():
+            st.write(f"**{FIELD_LABELS.get(k, k)}**")
+            st.write(f"• Before: {diffv['before']}")
+            st.write(f"• After:  {diffv['after']}")
+            st.write("---")
 
 # --- Editor form ---
 with st.form("edit_product", clear_on_submit=False):
@@ -82,11 +107,13 @@ with st.form("edit_product", clear_on_submit=False):
             options=["pending", "in_review", "approved", "rejected"],
             index=["pending", "in_review", "approved", "rejected"].index(prod.get("review_status", "pending")),
         )
-        score = st.number_input(
+        st.number_input(
             "Completeness score",
             value=int(prod.get("completeness_score") or 0),
             min_value=0,
             max_value=200,
+            disabled=True,
+            help="Computed from the product's fields and kept assets by the scoring engine (services/scoring.py).",
         )
         srcs_text = ", ".join(prod.get("source_urls") or [])
         srcs_text = st.text_area("Source URLs (comma-separated)", srcs_text)
@@ -158,9 +185,7 @@ with st.form("edit_product", clear_on_submit=False):
             "indications": (ind or "").strip() or None,
             "contraindications": (contra or "").strip() or None,
             "regulatory_status": reg or "unknown",
-            "completeness_score": int(score),
             "source_urls": source_urls if source_urls else [],
-            "updated_at": datetime.now(timezone.utc).isoformat(),
         }
 
         # ---- compute diff vs original row (prod) ----
@@ -174,33 +199,20 @@ with st.form("edit_product", clear_on_submit=False):
             st.info("No changes detected — nothing to save.")
         else:
             try:
-                # 1) Update
-                client.table("staging_products").update(payload).eq("id", pid).execute()
-
-                # 2) Read back to keep UI fresh
-                prod = (
-                    client.table("staging_products")
-                    .select("*")
-                    .eq("id", pid)
-                    .single()
-                    .execute()
-                ).data
-
-                # 3) Human-friendly summary
-                changed_labels = [FIELD_LABELS.get(k, k) for k in changed.keys()]
-                st.success(f"Saved ✔  Updated: {', '.join(changed_labels)}")
-
-                with st.expander("See details of what changed"):
-                    for k, diffv in changed.items():
-                        st.write(f"**{FIELD_LABELS.get(k, k)}**")
-                        st.write(f"• Before: {diffv['before']}")
-                        st.write(f"• After:  {diffv['after']}")
-                        st.write("---")
-
-                # keep current selection and refresh the form with new values
+                # one call: send only the changed columns, get the updated row back
+                # (PostgREST return=representation)
+                patch = {k: payload[k] for k in changed}
+                patch["updated_at"] = datetime.now(timezone.utc).isoformat()
+                rows = client.table("staging_products").update(patch).eq("id", pid).execute().data or []
+                if not rows:
+                    raise RuntimeError("Update returned no data. Check payload types or table RLS.")
+
+                # keep current selection and refresh the form from the returned row
+                st.session_state["product_seed"] = rows[0]
+                st.session_state["product_saved"] = changed
                 st.session_state["selected_product_id"] = pid
                 st.query_params["pid"] = pid
-                st.rerun()
+                page_rerun()
 
             except Exception as e:
                 st.error("Save failed.")
@@ -211,52 +223,147 @@ with st.form("edit_product", clear_on_submit=False):
 
 # --- Assets section ---
 st.subheader("Assets")
-assets = (
-    client.table("staging_assets")
-    .select("id, asset_type, content_category, file_url, file_name, keep_asset, description, title")
-    .eq("staging_product_id", pid)
-    .order("created_at", desc=True)
-    .execute()
-    .data
-    or []
-)
+# paged by id: one unpaged select stops at PostgREST's max-rows (1000)
+assets = [
+    a
+    for page in id_pages(
+        lambda: client.table("staging_assets")
+        .select("id, asset_type, content_category, file_url, file_name, keep_asset, description, title, created_at")
+        .eq("staging_product_id", pid)
+    )
+    for a in page
+]
+assets.sort(key=lambda a: a.get("created_at") or "", reverse=True)
 
 if not assets:
     st.caption("No assets linked.")
 else:
-    for a in assets:
-        with st.expander(f"{a.get('file_name') or 'unnamed'}  •  {a.get('asset_type','?')}", expanded=False):
-            c1, c2, c3 = st.columns([3, 1, 1])
-            with c1:
-                st.write(a.get("file_url") or "")
-                st.write(a.get("title") or "")
-                st.write(a.get("description") or "")
-            with c2:
-                keep_val = st.checkbox("Keep", value=bool(a.get("keep_asset")), key=f"keep_{a['id']}")
-            with c3:
-                cat_opts = ["", "regulatory", "clinical", "marketing", "datasheet", "whitepaper", "image", "video"]
-                cat_idx = 0 if not a.get("content_category") else cat_opts.index(a.get("content_category"))
-                cat_val = st.selectbox("Category", options=cat_opts, index=cat_idx, key=f"cat_{a['id']}")
-
-            if st.button("Save asset", key=f"save_{a['id']}"):
-                try:
-                    client.table("staging_assets").update(
-                        {"keep_asset": keep_val, "content_category": cat_val or None}
-                    ).eq("id", a["id"]).execute()
-                    st.success("Asset saved.")
-                except Exception as e:
-                    st.error("Asset save failed.")
-                    st.exception(e)
+    import pandas as pd
+
+    # one grid for all assets: the grid virtualizes rows, so hundreds of assets
+    # render as fast as a handful, and edits are committed together
+    cols = ["id", "file_name", "asset_type", "title", "file_url", "keep_asset", "content_category", "description"]
+    df = pd.DataFrame(assets)[cols]
+    df["content_category"] = df["content_category"].fillna("")
+
+    with st.form("edit_assets", clear_on_submit=False):
+        edited = st.data_editor(
+            df,
+            hide_index=True,
+            use_container_width=True,
+            height=min(38 + 35 * len(df), 560),
+            disabled=["id", "file_name", "asset_type", "title", "file_url", "description"],
+            column_order=["keep_asset", "content_category", "file_name", "asset_type", "title", "file_url", "description"],
+            column_config={
+                "keep_asset": st.column_config.CheckboxColumn("Keep", width="small"),
+                "content_category": st.column_config.SelectboxColumn("Category", options=CONTENT_CATEGORIES),
+                "file_name": "File",
+                "asset_type": "Type",
+                "title": "Title",
+                "file_url": st.column_config.LinkColumn("URL"),
+                "description": "Description",
+            },
+            key=f"assets_editor_{pid}",
+        )
+        save_assets = st.form_submit_button("Save asset changes")
+
+    if save_assets:
+        changes = dirty_rows(assets, edited.to_dict("records"))
+        if not changes:
+            st.info("No asset changes to save.")
+        else:
+            try:
+                t0 = time.perf_counter()
+                n = bulk_update_assets(client, changes)
+                st.success(f"Saved {n} asset(s) in {(time.perf_counter() - t0) * 1000:.0f} ms.")
+            except Exception as e:
+                st.error("Asset save failed.")
+                st.exception(e)
+
+    if st.button("🔗 Check links", help="HEAD-check every asset URL (results are cached for a few hours)"):
+        from services.validators import broken_assets  # httpx, only when checking
+
+        with st.spinner("Checking links…"):
+            broken = broken_assets(client, pid)
+        if broken:
+            st.warning(f"{len(broken)} broken link(s).")
+            st.table([{"Asset": b["file_url"] or b["asset_id"], "Problem": b["status"] or b["error"]} for b in broken])
+        else:
+            st.success("Every asset link resolves.")
+
+    # previews are rendered on demand for the one selected PDF only (first page,
+    # byte-range fetch, disk cached), so the asset list itself never downloads files
+    pdfs = [a for a in assets if is_pdf_asset(a)]
+    if pdfs:
+        labels = {a["id"]: a.get("title") or a.get("file_name") or a["file_url"] for a in pdfs}
+        preview_id = st.selectbox(
+            "Preview PDF",
+            options=[None] + list(labels),
+            format_func=lambda i: "(none)" if i is None else labels[i],
+            key=f"asset_preview_{pid}",
+        )
+        if preview_id:
+            url = next(a["file_url"] for a in pdfs if a["id"] == preview_id)
+            with st.spinner("Rendering first page…"):
+                png = pdf_thumbnail(url)
+            if png:
+                st.image(png, caption=labels[preview_id], width=480)
+            else:
+                st.caption(f"No preview available. [Open PDF]({url})")
 
 st.divider()
-c1, c2, c3 = st.columns(3)
+c1, c2, c3, c4 = st.columns(4)
 if c1.button("✅ Approve for Global Library", type="primary"):
     client.table("staging_products").update({"review_status": "approved"}).eq("id", pid).execute()
     st.success("Marked as approved.")
-    st.rerun()
+    page_rerun()
 if c2.button("🕓 Mark In Review"):
     client.table("staging_products").update({"review_status": "in_review"}).eq("id", pid).execute()
-    st.rerun()
+    page_rerun()
 if c3.button("⛔ Reject"):
     client.table("staging_products").update({"review_status": "rejected"}).eq("id", pid).execute()
-    st.rerun()
+    page_rerun()
+if c4.button(
+    "🚀 Queue promotion",
+    disabled=prod.get("review_status") != "approved" or bool(prod.get("promoted_to_gl")),
+    help="Promote to the Global Library in the background",
+):
+    ensure_inprocess_workers()
+    enqueue_promotions(client, [pid])
+    page_rerun()
+
+# --- Promotion status (polls while a job is open) ---
+# workers update the log with their own client, so poll uncached
+job = latest_job(sb(), pid)
+
+
+def _promotion_status():
+    j = latest_job(sb(), pid) or {}
+    s = j.get("promotion_status")
+    if s in ("queued", "running"):
+        st.info(f"Promotion {s} (attempt {j.get('attempts') or 0}/{j.get('max_attempts') or 1})…")
+    elif s == "success":
+        if job and job.get("promotion_status") in ("queued", "running"):
+            # just finished: reload the product with its GL ids. The worker wrote
+            # them through its own client, so this session's cached rows are stale
+            client.clear()
+            page_rerun()
+        st.success(f"Promoted to Global Library (assets: {j.get('assets_promoted_count') or 0})")
+    elif s == "failed":
+        if job and job.get("promotion_status") in ("queued", "running"):
+            client.clear()
+            page_rerun()
+        st.error(f"Promotion failed: {j.get('error_message') or 'unknown error'}")
+
+
+if job:
+    active = job.get("promotion_status") in ("queued", "running")
+    st.fragment(_promotion_status, run_every=3 if active else None)()
+
+qc = client.stats()
+st.sidebar.caption(
+    f"Query cache: {qc['hits']} hits / {qc['misses']} misses ({qc['hit_rate']:.0%}) · "
+    f"edits from workers or other app instances can take up to {client.ttl:.0f} s to show"
+)
+
+page_done()
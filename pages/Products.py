@@ -1,44 +1,100 @@
 # pages/Products.py
+import os
+import tempfile
 import streamlit as st
-from supabase_client import sb
-from datetime import datetime
+from supabase_client import sb, session_sb
+from services.products import FacetCache, bulk_update_products, normalize_query, product_page
+from services.change_feed import change_feed
+from services.snapshots import catalog_snapshots, to_timestamp
+from services.promotion_jobs import enqueue_promotions, ensure_inprocess_workers
+from services.catalog_io import FORMATS, export_catalog, import_catalog
+from services.perf import page_done, page_rerun, track_page
 
 st.set_page_config(page_title="Product Browser", layout="wide")
 st.title("🧭 Product Browser")
+track_page("Products")
 
-client = sb()
+client = session_sb()
 
 # ── Filters ──────────────────────────────────────────────────────────────────
-# Pull all manufacturers (no RPC)
-resp = client.table("staging_products").select("manufacturer").execute()
-all_mfrs = sorted({(r.get("manufacturer") or "").strip() for r in (resp.data or []) if (r.get("manufacturer") or "").strip()})
-manufacturer = st.selectbox("Manufacturer", options=["(All)"] + all_mfrs, index=0)
+@st.cache_resource
+def _facets() -> FacetCache:
+    # shared by every session; refreshes only when staging_products changes
+    return FacetCache(ttl=30)
+
+
+snapshots = catalog_snapshots()
+# vectorized value_counts over the shared snapshot; server facets until it has loaded
+mfr_counts = snapshots.facets("manufacturer") if snapshots.products.ready else _facets().get(sb())
+manufacturer = st.selectbox(
+    "Manufacturer",
+    options=["(All)"] + sorted(mfr_counts),
+    index=0,
+    format_func=lambda v: v if v == "(All)" else f"{v} ({mfr_counts[v]:,})",
+)
 
 status = st.selectbox("Review status", options=["(All)", "pending", "in_review", "approved", "rejected"], index=0)
-q = st.text_input("Search (name / description contains)")
+q = normalize_query(st.text_input("Search (name / manufacturer / description, prefix match)"))
+
+page_size = st.selectbox("Rows per page", options=[20, 50, 100, 250, 500], index=0)
+
+# ── Query with filters (one bounded request per page) ─────────────────────────
+filters = {
+    "manufacturer": manufacturer if manufacturer != "(All)" else None,
+    "status": status if status != "(All)" else None,
+    "q": q,
+}
+
+# keyset cursors for pages visited so far; reset whenever the filters change
+sig = tuple(filters.values()) + (page_size,)
+if st.session_state.get("products_sig") != sig:
+    st.session_state["products_sig"] = sig
+    st.session_state["products_cursors"] = [None]
+cursors = st.session_state["products_cursors"]
+page = len(cursors)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _search_page(after, page_size, manufacturer, status, q):
+    # reruns with the same (normalized) query are served from memory, which
+    # debounces repeated submits and widget interactions while a search is active
+    return product_page(sb(), manufacturer=manufacturer, status=status, q=q, after=after, page_size=page_size)
 
-# ── Query with filters ────────────────────────────────────────────────────────
-qrb = client.table("staging_products").select(
-    "id, product_name, manufacturer, category, completeness_score, review_status, created_at, updated_at"
-).order("updated_at", desc=True)
 
-if manufacturer != "(All)":
-    qrb = qrb.eq("manufacturer", manufacturer)
-if status != "(All)":
-    qrb = qrb.eq("review_status", status)
 if q:
-    # simple contains on 2 fields
-    qrb = qrb.or_(f"product_name.ilike.%{q}%,description.ilike.%{q}%")
+    result = _search_page(cursors[-1], page_size, **filters)
+elif snapshots.products.ready:
+    # browse pages come from the process-wide columnar snapshot; no round trip
+    result = snapshots.product_page(filters["manufacturer"], filters["status"], after=cursors[-1], page_size=page_size)
+else:
+    # the feed is still doing its initial load; page from the server meanwhile
+    result = product_page(client, after=cursors[-1], page_size=page_size, **filters)
+total = result["total"]
 
-data = (qrb.execute().data) or []
+# overlay rows other curators changed since this page was fetched (change feed mirror)
+feed = change_feed()
+page_rows, patched = [], 0
+for r in result["rows"]:
+    m = feed.products.get(r["id"])
+    # compared as times: the feed and PostgREST format the same instant differently
+    if m and m.get("updated_at") and (not r.get("updated_at") or to_timestamp(m["updated_at"]) > to_timestamp(r["updated_at"])):
+        r, patched = {**r, **m}, patched + 1
+    page_rows.append(r)
 
 # ── Paging ───────────────────────────────────────────────────────────────────
-page_size = 20
-total = len(data)
-page = st.number_input("Page", min_value=1, value=1, step=1)
-start, end = (page - 1) * page_size, (page - 1) * page_size + page_size
-page_rows = data[start:end]
-st.caption(f"Showing {start+1}-{min(end, total)} of {total}")
+start = (page - 1) * page_size
+p1, p2, p3 = st.columns([1, 1, 4])
+if p1.button("◀ Prev", disabled=page == 1):
+    cursors.pop()
+    page_rerun()
+if p2.button("Next ▶", disabled=result["next"] is None):
+    cursors.append(result["next"])
+    page_rerun()
+of_total = f" of ~{total:,}" if total is not None else ""
+live = f" · 🔄 {patched} updated live" if patched else ""
+p3.caption(f"Page {page} · showing {start+1 if page_rows else 0}-{start+len(page_rows)}{of_total}{live}")
+if result.get("truncated"):
+    st.caption("Broad search: ranked the 1,000 most recently updated matches plus name matches. Refine the query or filter by manufacturer / status to reach older products.")
 
 # ── Render table + selector ──────────────────────────────────────────────────
 import pandas as pd
@@ -53,8 +109,51 @@ if page_rows:
         "created_at": "Created",
         "updated_at": "Updated",
     })[["Product","Manufacturer","Category","Score","Status","Updated","id"]]
-    # show id but keep it at the end
-    st.dataframe(df_view, use_container_width=True, hide_index=True)
+    # show id but keep it at the end; tick rows for bulk actions
+    event = st.dataframe(
+        df_view,
+        use_container_width=True,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="multi-row",
+        key=f"products_table_{page}",
+    )
+    selected_ids = [page_rows[i]["id"] for i in event.selection.rows]
+
+    # ── Bulk review actions (one request for the whole selection) ────────────
+    with st.expander(f"Bulk actions · {len(selected_ids)} selected", expanded=bool(selected_ids)):
+        apply_all = st.checkbox(f"Apply to all {len(page_rows)} rows on this page", value=False)
+        target_ids = [r["id"] for r in page_rows] if apply_all else selected_ids
+
+        with st.form("bulk_edit", clear_on_submit=True):
+            b1, b2, b3, b4 = st.columns(4)
+            new_status = b1.selectbox("Review status", ["(unchanged)", "pending", "in_review", "approved", "rejected"])
+            new_reg = b2.selectbox("Regulatory status", ["(unchanged)", "unknown", "fda", "ce", "other"])
+            new_mfr = b3.text_input("Manufacturer", placeholder="(unchanged)")
+            new_cat = b4.text_input("Category", placeholder="(unchanged)")
+            apply = st.form_submit_button(f"Apply to {len(target_ids)} product(s)", type="primary", disabled=not target_ids)
+
+        if apply:
+            fields = {}
+            if new_status != "(unchanged)":
+                fields["review_status"] = new_status
+            if new_reg != "(unchanged)":
+                fields["regulatory_status"] = new_reg
+            if new_mfr.strip():
+                fields["manufacturer"] = new_mfr.strip()
+            if new_cat.strip():
+                fields["category"] = new_cat.strip()
+            if not fields:
+                st.info("Nothing to change — pick at least one field.")
+            else:
+                try:
+                    n = bulk_update_products(client, target_ids, fields)
+                    _search_page.clear()
+                    st.toast(f"Updated {n} product(s): {', '.join(fields)}")
+                    page_rerun()
+                except Exception as e:
+                    st.error("Bulk update failed.")
+                    st.exception(e)
 
     chosen_id = st.selectbox(
         "Select a product to open",
@@ -70,6 +169,101 @@ if page_rows:
             st.switch_page("pages/Product_Detail.py")
     with col2:
         if st.button("Refresh"):
-            st.rerun()
+            _search_page.clear()
+            client.clear()
+            page_rerun()
 else:
     st.info("No rows found with current filters.")
+
+# ── Background promotion ─────────────────────────────────────────────────────
+with st.expander("🚀 Promote approved products"):
+    st.caption("Queues approved, not-yet-promoted products for the current manufacturer filter (up to 500 per click). Workers promote them in the background.")
+    if st.button("Queue promotions"):
+        qrb = client.table("staging_products").select("id").eq("review_status", "approved").not_.is_("promoted_to_gl", "true")
+        if filters["manufacturer"]:
+            qrb = qrb.eq("manufacturer", filters["manufacturer"])
+        ids = [r["id"] for r in (qrb.limit(500).execute().data or [])]
+        ensure_inprocess_workers()
+        queued = enqueue_promotions(client, ids)
+        st.success(f"Queued {len(queued)} product(s), {len(ids) - len(queued)} already had a job open. Progress is on the Dashboard.")
+
+# ── Bulk export / import ─────────────────────────────────────────────────────
+with st.expander("📦 Export / import"):
+    st.caption(
+        "Export writes the products matching the manufacturer / status filters (search is ignored) and their "
+        "assets to a zip, 1,000 products at a time. Import updates products by id (only the file's columns) and "
+        "inserts rows without one; array columns take comma-separated values, as in the editor."
+    )
+    e1, e2 = st.columns([1, 3])
+    fmt = e1.radio("Format", FORMATS, horizontal=True, key="export_format")
+    if e2.button("Build export"):
+        bar = st.progress(0.0, text="Exporting…")
+
+        def _export_progress(s):
+            frac = min(1.0, s["products"] / s["total"]) if s["total"] else 0.0
+            bar.progress(frac, text=f"{s['products']:,} products · {s['assets']:,} assets · {s['rows_per_sec']:,.0f} rows/s")
+
+        old = st.session_state.pop("catalog_export", None)
+        if old and os.path.exists(old["path"]):
+            os.remove(old["path"])
+        fd, path = tempfile.mkstemp(prefix="catalog-export-", suffix=".zip")
+        os.close(fd)
+        try:
+            # straight through sb(): export pages should not fill the session query cache
+            stats = export_catalog(sb(), path, fmt, manufacturer=filters["manufacturer"], status=filters["status"], progress=_export_progress)
+            st.session_state["catalog_export"] = {"path": path, "name": f"staging_catalog_{fmt}.zip", "stats": stats}
+        except Exception as e:
+            os.remove(path)
+            st.error("Export failed.")
+            st.exception(e)
+        bar.empty()
+
+    exp = st.session_state.get("catalog_export")
+    if exp and os.path.exists(exp["path"]):
+        s = exp["stats"]
+        st.caption(
+            f"{s['products']:,} products + {s['assets']:,} assets in {s['seconds']:.1f}s "
+            f"({s['rows_per_sec']:,.0f} rows/s) · {s['bytes'] / 2**20:.1f} MiB"
+        )
+        with open(exp["path"], "rb") as fh:
+            st.download_button("Download export", fh, file_name=exp["name"], mime="application/zip", on_click="ignore")
+
+    st.divider()
+    upload = st.file_uploader("Import products (CSV, CSV.gz, Parquet or an export zip)", type=["csv", "gz", "parquet", "zip"])
+    dry_run = st.checkbox("Validate only (write nothing)", value=False)
+    if upload is not None and st.button("Run import", type="primary"):
+        bar = st.progress(0.0, text="Importing…")
+
+        def _import_progress(s):
+            bar.progress(min(1.0, s["fraction"] or 0.0), text=f"{s['rows']:,} rows · {s['rows_per_sec']:,.0f} rows/s")
+
+        try:
+            res = import_catalog(sb(), upload, upload.name, dry_run=dry_run, progress=_import_progress)
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            bar.empty()
+            i1, i2, i3, i4, i5 = st.columns(5)
+            i1.metric("Rows", f"{res['rows']:,}", help=f"{res['seconds']:.1f}s · {res['rows_per_sec']:,.0f} rows/s")
+            i2.metric("Inserted", f"{res['inserted']:,}")
+            i3.metric("Updated", f"{res['updated']:,}", help=f"{res['unchanged']:,} matched but unchanged")
+            i4.metric("Invalid", f"{res['invalid']:,}")
+            i5.metric("Failed", f"{res['failed']:,}")
+            if res["errors"]:
+                st.dataframe(res["errors"], hide_index=True, use_container_width=True)
+            if not dry_run:
+                _search_page.clear()
+                client.clear()
+
+qc = client.stats()
+st.sidebar.caption(
+    f"Query cache: {qc['hits']} hits / {qc['misses']} misses ({qc['hit_rate']:.0%}) · "
+    f"edits from workers or other app instances can take up to {client.ttl:.0f} s to show"
+)
+ss = snapshots.stats()
+st.sidebar.caption(
+    f"Catalog snapshot: {ss['products_rows']:,} products / {ss['assets_rows']:,} assets · "
+    f"{ss['memory_bytes'] / 2**20:.1f} MiB · last build {ss['last_build_ms']:.0f} ms"
+)
+
+page_done()
@@ -0,0 +1,36 @@
+# services/assets.py
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List
+
+from services.query_cache import invalidate_table
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+EDITABLE_COLUMNS = ("keep_asset", "content_category")
+CONTENT_CATEGORIES = ["", "regulatory", "clinical", "marketing", "datasheet", "whitepaper", "image", "video"]
+
+
+def dirty_rows(before: List[dict], after: List[dict]) -> List[dict]:
+    """Rows whose editable columns changed, as {"id", "keep_asset", "content_category"}."""
+    orig = {r["id"]: r for r in before}
+    out = []
+    for r in after:
+        o = orig.get(r["id"])
+        if o is None:
+            continue
+        keep = bool(r.get("keep_asset"))
+        cat = r.get("content_category") or None
+        if keep != bool(o.get("keep_asset")) or cat != (o.get("content_category") or None):
+            out.append({"id": r["id"], "keep_asset": keep, "content_category": cat})
+    return out
+
+
+def bulk_update_assets(client: Client, rows: List[Dict]) -> int:
+    """Write keep_asset/content_category for many assets in one rpc('bulk_update_assets')."""
+    if not rows:
+        return 0
+    n = client.rpc("bulk_update_assets", {"p_rows": rows}).execute().data
+    invalidate_table("staging_assets")
+    return int(n or 0)
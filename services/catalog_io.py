@@ -0,0 +1,397 @@
+# services/catalog_io.py
+"""
+Bulk CSV / Parquet export and import of the staging catalog.
+
+Export walks staging_products (optionally filtered like the Products page) in
+id-keyset pages of `batch_size`, fetches each page's assets IN_CHUNK product
+ids at a time (in pages too, however many assets a product has) and appends
+both to files on disk as it goes, so memory holds one page whatever the
+catalog size. The result is one zip with staging_products.<fmt>
+and staging_assets.<fmt>. In CSV, array columns are written comma-joined,
+which is what _to_array reads back.
+
+Import reads a products file (CSV, CSV.gz, Parquet, or an export zip) in
+batches, coerces each row as the editor does (supabase_client.coerce_fields:
+_to_array for array columns, empty strings to NULL), validates it, and applies
+each batch with one rpc('import_staging_products') (sql/011_catalog_import.sql).
+Rows whose id exists are updated in the file's columns only; the rest are
+inserted. Export-only columns (scores, promotion state, timestamps) are
+ignored. Invalid rows are skipped and reported; a failed batch does not stop
+the import.
+
+    python -m services.catalog_io export catalog.zip --format parquet --status approved
+    python -m services.catalog_io import staging_products.csv --dry-run
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+import uuid
+import zipfile
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from services.metrics import REVIEW_STATUSES
+from services.products import apply_filters, id_pages, select_in_chunks
+from services.query_cache import invalidate_table
+from supabase_client import ARRAY_COLUMNS, coerce_fields
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+log = logging.getLogger(__name__)
+
+FORMATS = ("csv", "parquet")
+BATCH_SIZE = 1000
+MAX_ERRORS = 50  # detailed messages kept; the rest are only counted
+
+PRODUCT_COLUMNS = (
+    "id", "product_name", "manufacturer", "category", "description", "indications", "contraindications",
+    "regulatory_status", "review_status", "completeness_score", "source_urls", "source_page_ids",
+    "active_ingredients", "promoted_to_gl", "gl_product_id", "promoted_at", "created_at", "updated_at",
+)
+ASSET_COLUMNS = (
+    "id", "staging_product_id", "asset_type", "content_category", "file_url", "file_name", "file_size_bytes",
+    "keep_asset", "title", "description", "promoted_to_gl", "gl_asset_id", "created_at", "updated_at",
+)
+# written by import (must match the allow-list in sql/011_catalog_import.sql, plus id)
+IMPORT_COLUMNS = (
+    "id", "product_name", "manufacturer", "category", "description", "indications", "contraindications",
+    "regulatory_status", "review_status", "source_urls", "source_page_ids", "active_ingredients",
+)
+# exported for reference, owned by the scorer / promotion / the database
+IGNORED_COLUMNS = ("completeness_score", "promoted_to_gl", "gl_product_id", "promoted_at", "created_at", "updated_at")
+
+_INT_COLUMNS = ("completeness_score", "file_size_bytes")
+_BOOL_COLUMNS = ("promoted_to_gl", "keep_asset")
+
+Progress = Optional[Callable[[Dict[str, Any]], None]]
+
+
+def _throughput(stats: Dict[str, Any], t0: float, rows: int):
+    stats["seconds"] = time.perf_counter() - t0
+    stats["rows_per_sec"] = rows / stats["seconds"] if stats["seconds"] else 0.0
+
+
+# ── export ───────────────────────────────────────────────────────────────────
+def _csv_cell(v) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, list):
+        return ", ".join(str(x) for x in v)
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    return str(v)
+
+
+class _CsvSink:
+    def __init__(self, path: str, columns: Tuple[str, ...]):
+        self.columns = columns
+        self.f = open(path, "w", encoding="utf-8", newline="")
+        self.w = csv.writer(self.f)
+        self.w.writerow(columns)
+
+    def write(self, rows: List[dict]):
+        self.w.writerows([_csv_cell(r.get(c)) for c in self.columns] for r in rows)
+
+    def close(self):
+        self.f.close()
+
+
+class _ParquetSink:
+    """One row group per page; timestamps stay ISO strings as PostgREST returns them."""
+
+    def __init__(self, path: str, columns: Tuple[str, ...]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        def typ(c):
+            if c in ARRAY_COLUMNS:
+                return pa.list_(pa.string())
+            if c in _INT_COLUMNS:
+                return pa.int64()
+            if c in _BOOL_COLUMNS:
+                return pa.bool_()
+            return pa.string()
+
+        self.pa = pa
+        self.schema = pa.schema([(c, typ(c)) for c in columns])
+        self.w = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def write(self, rows: List[dict]):
+        if rows:
+            self.w.write_table(self.pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.w.close()
+
+
+def _product_pages(client: Client, manufacturer: Optional[str], status: Optional[str], batch_size: int) -> Iterator[List[dict]]:
+    """Filtered staging_products in ascending id keyset pages (stable while rows are edited)."""
+    return id_pages(
+        lambda: apply_filters(client.table("staging_products").select(", ".join(PRODUCT_COLUMNS)), manufacturer, status),
+        batch_size,
+    )
+
+
+def export_catalog(
+    client: Client,
+    out,
+    fmt: str = "csv",
+    manufacturer: Optional[str] = None,
+    status: Optional[str] = None,
+    batch_size: int = BATCH_SIZE,
+    progress: Progress = None,
+) -> Dict[str, Any]:
+    """
+    Write filtered products and their assets to `out` (path or binary file) as a zip.
+    Returns {"products", "assets", "total", "bytes", "seconds", "rows_per_sec"};
+    `total` is the planner's estimate, for progress only.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt} ({', '.join(FORMATS)})")
+    sink = _CsvSink if fmt == "csv" else _ParquetSink
+    t0 = time.perf_counter()
+    total = apply_filters(client.table("staging_products").select("id", count="estimated", head=True), manufacturer, status).execute().count
+    stats: Dict[str, Any] = {"products": 0, "assets": 0, "total": total, "bytes": 0, "seconds": 0.0, "rows_per_sec": 0.0}
+
+    with tempfile.TemporaryDirectory(prefix="catalog-export-") as tmp:
+        paths = [os.path.join(tmp, f"staging_products.{fmt}"), os.path.join(tmp, f"staging_assets.{fmt}")]
+        products, assets = sink(paths[0], PRODUCT_COLUMNS), sink(paths[1], ASSET_COLUMNS)
+        try:
+            for page in _product_pages(client, manufacturer, status, batch_size):
+                products.write(page)
+                rows = select_in_chunks(client, "staging_assets", ", ".join(ASSET_COLUMNS), "staging_product_id", [p["id"] for p in page])
+                assets.write(rows)
+                stats["products"] += len(page)
+                stats["assets"] += len(rows)
+                _throughput(stats, t0, stats["products"] + stats["assets"])
+                if progress:
+                    progress(dict(stats))
+        finally:
+            products.close()
+            assets.close()
+
+        # CSV compresses well; Parquet is already compressed (and stays seekable for import)
+        compression = zipfile.ZIP_DEFLATED if fmt == "csv" else zipfile.ZIP_STORED
+        with zipfile.ZipFile(out, "w", compression=compression, allowZip64=True) as zf:
+            for p in paths:
+                zf.write(p, os.path.basename(p))
+    stats["bytes"] = os.path.getsize(out) if isinstance(out, (str, os.PathLike)) else out.tell()
+    _throughput(stats, t0, stats["products"] + stats["assets"])
+    return stats
+
+
+# ── import ───────────────────────────────────────────────────────────────────
+def _size(f) -> Optional[int]:
+    try:
+        pos = f.tell()
+        size = f.seek(0, io.SEEK_END)
+        f.seek(pos)
+        return size
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def read_batches(
+    f, name: str, batch_size: int = BATCH_SIZE, size: Optional[int] = None
+) -> Tuple[List[str], Iterator[Tuple[List[dict], Optional[float]]]]:
+    """
+    (columns, iterator of (rows, fraction read)) for a products file, `batch_size` rows at a time.
+    `name` picks the reader: .csv, .csv.gz, .parquet, or an export .zip.
+    """
+    lower = name.lower()
+    if lower.endswith(".zip"):
+        zf = zipfile.ZipFile(f)
+        member = next((n for n in zf.namelist() if os.path.basename(n).startswith("staging_products.")), None)
+        if member is None:
+            raise ValueError(f"{name}: no staging_products.csv / .parquet inside")
+        # seeking a deflated member to its end would decompress it twice; the zip knows its size
+        return read_batches(zf.open(member), member, batch_size, size=zf.getinfo(member).file_size)
+
+    if lower.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        pf = pq.ParquetFile(f)
+        columns = pf.schema_arrow.names
+        wanted = [c for c in columns if c in IMPORT_COLUMNS]
+        n = pf.metadata.num_rows or 1
+
+        def parquet_batches():
+            done = 0
+            # only the columns import writes; memory is bounded by the file's row groups
+            for b in pf.iter_batches(batch_size=batch_size, columns=wanted):
+                done += b.num_rows
+                yield b.to_pylist(), done / n
+
+        return columns, parquet_batches()
+
+    if lower.endswith(".csv.gz") or lower.endswith(".gz"):
+        raw, size = gzip.open(f), None
+    elif lower.endswith(".csv"):
+        raw, size = f, size or _size(f)
+    else:
+        raise ValueError(f"Unsupported file type: {name} (csv, csv.gz, parquet or an export zip)")
+
+    csv.field_size_limit(16 * 1024 * 1024)  # long descriptions
+    reader = csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+    columns = [c.strip() for c in (reader.fieldnames or [])]
+    reader.fieldnames = columns
+
+    def csv_batches():
+        batch = []
+        for row in reader:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch, (f.tell() / size if size else None)
+                batch = []
+        if batch:
+            yield batch, 1.0
+
+    return columns, csv_batches()
+
+
+def prepare_row(raw: dict, columns: List[str]) -> Tuple[Optional[dict], Optional[str]]:
+    """(row ready for import_staging_products, None) or (None, reason)."""
+    row = {}
+    for c in columns:
+        v = raw.get(c)
+        if v is not None and not isinstance(v, (str, list)):
+            v = str(v)  # Parquet scalars of other types
+        row[c] = v
+    row = coerce_fields(row)
+
+    if row.get("id") is not None:
+        try:
+            row["id"] = str(uuid.UUID(row["id"].strip()))
+        except ValueError:
+            return None, f"id is not a UUID: {row['id']!r}"
+    if "review_status" in row and row["review_status"] not in REVIEW_STATUSES:
+        return None, f"review_status must be one of {', '.join(REVIEW_STATUSES)} (got {row['review_status']!r})"
+    if "regulatory_status" in row and row["regulatory_status"] is None:
+        row["regulatory_status"] = "unknown"  # as the editor saves it
+    for c in ARRAY_COLUMNS:
+        if isinstance(row.get(c), list):
+            row[c] = [str(x).strip() for x in row[c] if x is not None and str(x).strip()]
+    if row.get("id") is None and not row.get("product_name"):
+        return None, "new rows (no id) need a product_name"
+    return row, None
+
+
+def import_catalog(
+    client: Client,
+    f,
+    name: str,
+    batch_size: int = BATCH_SIZE,
+    dry_run: bool = False,
+    progress: Progress = None,
+) -> Dict[str, Any]:
+    """
+    Validate and apply a products file batch by batch (see read_batches / prepare_row).
+    Returns {"rows", "inserted", "updated", "unchanged", "invalid", "failed",
+             "errors": [{"row", "error"}], "fraction", "seconds", "rows_per_sec"};
+    with dry_run nothing is written.
+    """
+    t0 = time.perf_counter()
+    columns, batches = read_batches(f, name, batch_size)
+    unknown = [c for c in columns if c not in IMPORT_COLUMNS and c not in IGNORED_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+    write_columns = [c for c in IMPORT_COLUMNS if c in columns]
+    if not [c for c in write_columns if c != "id"]:
+        raise ValueError(f"Nothing to import: no editable column in {', '.join(columns) or 'the file'}")
+
+    stats: Dict[str, Any] = {
+        "rows": 0, "inserted": 0, "updated": 0, "unchanged": 0, "invalid": 0, "failed": 0,
+        "errors": [], "fraction": 0.0, "seconds": 0.0, "rows_per_sec": 0.0,
+    }
+
+    def note(row_no, error):
+        if len(stats["errors"]) < MAX_ERRORS:
+            stats["errors"].append({"row": row_no, "error": error})
+
+    for raw_rows, fraction in batches:
+        first = stats["rows"] + 1
+        batch: Dict[Any, dict] = {}
+        for i, raw in enumerate(raw_rows):
+            row, error = prepare_row(raw, write_columns)
+            if error:
+                stats["invalid"] += 1
+                note(first + i, error)
+            else:
+                # a repeated id within a batch: the last row wins, as if applied in order
+                batch[row.get("id") or i] = row
+        stats["rows"] += len(raw_rows)
+        if batch and not dry_run:
+            try:
+                res = client.rpc("import_staging_products", {"p_rows": list(batch.values()), "p_columns": write_columns}).execute().data
+                res = (res[0] if isinstance(res, list) else res) or {}
+                for k in ("inserted", "updated", "unchanged"):
+                    stats[k] += int(res.get(k) or 0)
+            except Exception as e:
+                stats["failed"] += len(batch)
+                note(f"{first}-{stats['rows']}", f"batch failed: {e}")
+        stats["fraction"] = fraction
+        _throughput(stats, t0, stats["rows"])
+        if progress:
+            progress(dict(stats))
+
+    if not dry_run and stats["rows"]:
+        invalidate_table("staging_products")
+    _throughput(stats, t0, stats["rows"])
+    return stats
+
+
+def main(argv: List[str]):
+    ap = argparse.ArgumentParser(description="Bulk export / import of the staging catalog.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    e = sub.add_parser("export", help="products + assets to a zip of CSV or Parquet files")
+    e.add_argument("out")
+    e.add_argument("--format", choices=FORMATS, default="csv")
+    e.add_argument("--manufacturer")
+    e.add_argument("--status", choices=REVIEW_STATUSES)
+    e.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    i = sub.add_parser("import", help="apply a products CSV / CSV.gz / Parquet / export zip")
+    i.add_argument("file")
+    i.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    i.add_argument("--dry-run", action="store_true", help="validate only")
+    args = ap.parse_args(argv)
+
+    from supabase_client import sb
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    last = [0.0]
+
+    def report(s):
+        if time.perf_counter() - last[0] >= 5:
+            last[0] = time.perf_counter()
+            done = s["products"] + s["assets"] if args.cmd == "export" else s["rows"]
+            log.info("%s rows, %.0f rows/s", f"{done:,}", s["rows_per_sec"])
+
+    if args.cmd == "export":
+        stats = export_catalog(sb(), args.out, args.format, args.manufacturer, args.status, args.batch_size, progress=report)
+        log.info(
+            "exported %s products + %s assets to %s (%.1f MiB) in %.1fs, %.0f rows/s",
+            f"{stats['products']:,}", f"{stats['assets']:,}", args.out, stats["bytes"] / 2**20, stats["seconds"], stats["rows_per_sec"],
+        )
+        return 0
+    with open(args.file, "rb") as f:
+        stats = import_catalog(sb(), f, args.file, args.batch_size, dry_run=args.dry_run, progress=report)
+    for err in stats["errors"]:
+        log.warning("row %s: %s", err["row"], err["error"])
+    log.info(
+        "%s %s rows in %.1fs (%.0f rows/s): %d inserted, %d updated, %d unchanged, %d invalid, %d failed",
+        "validated" if args.dry_run else "imported", f"{stats['rows']:,}", stats["seconds"], stats["rows_per_sec"],
+        stats["inserted"], stats["updated"], stats["unchanged"], stats["invalid"], stats["failed"],
+    )
+    return 1 if stats["invalid"] or stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
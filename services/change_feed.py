@@ -0,0 +1,210 @@
+# services/change_feed.py
+"""
+Per-process change feed for staging_products / staging_assets.
+
+A background thread polls each table for rows whose updated_at moved past the
+last watermark (sql/008_change_feed.sql keeps updated_at current on every write)
+and patches them into an in-memory mirror. Pages read the mirror and its
+`version` instead of re-querying: the Products list overlays newer rows, the
+Dashboard refreshes its metrics only when the version moved.
+
+Polling works against Supabase and a plain local Postgres/PostgREST alike.
+
+A table with more than CATALOG_MIRROR_MAX_ROWS rows (default 200000; 0 turns
+mirroring off) is not mirrored: the feed only watches it, keeping its `version`
+and the most recently changed rows, and pages fall back to server paging.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from services.products import LIST_COLUMNS, MAX_ROWS, changed_pages, id_pages
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+log = logging.getLogger(__name__)
+
+ASSET_COLUMNS = "id, staging_product_id, asset_type, content_category, keep_asset, promoted_to_gl, updated_at"
+# changed rows a watch-only mirror keeps for the Products overlay
+RECENT_ROWS = 10_000
+
+
+def _parse_ts(v: str) -> datetime:
+    return datetime.fromisoformat(v.replace("Z", "+00:00"))
+
+
+class TableMirror:
+    """
+    id -> row for one table, kept current from updated_at deltas.
+    - Initial load and deltas are read in (updated_at, id) keyset pages, until
+      an empty page (the server may cut any page short at its max-rows)
+    - Each poll re-reads an `overlap` window behind the watermark so rows from
+      transactions that committed late are not missed; unchanged rows are ignored
+    - Deleted rows are dropped by a periodic id reconcile, triggered when the
+      table's row count no longer matches the mirror
+    - Over `max_rows` rows the table is only watched (`complete` is False):
+      no initial load, `rows` keeps the RECENT_ROWS most recently changed rows
+    """
+
+    def __init__(
+        self,
+        table: str,
+        columns: str,
+        batch_size: int = MAX_ROWS,
+        overlap: float = 5.0,
+        reconcile_every: float = 300.0,
+        max_rows: Optional[int] = None,
+    ):
+        self.table = table
+        self.columns = columns
+        self.batch_size = batch_size
+        self.overlap = overlap
+        self.reconcile_every = reconcile_every
+        self.max_rows = max_rows
+        self.rows: Dict[str, dict] = {}
+        self.version = 0
+        self.loaded = False
+        self.complete = True
+        self.watermark: Optional[datetime] = None
+        self._reconciled = 0.0
+        self._lock = threading.RLock()
+        self._poll_lock = threading.RLock()  # one fetch at a time (feed thread or a waiting page)
+
+    def _fetch_since(self, client: Client, since: Optional[datetime]) -> List[dict]:
+        out = []
+        for page in changed_pages(client, self.table, self.columns, since, self.batch_size):
+            out.extend(page)
+        return out
+
+    def _apply(self, rows: List[dict]) -> int:
+        changed = 0
+        with self._lock:
+            for r in rows:
+                if self.rows.get(r["id"]) != r:
+                    if not self.complete:
+                        self.rows.pop(r["id"], None)  # re-insert as the newest
+                    self.rows[r["id"]] = r
+                    changed += 1
+                if r.get("updated_at"):
+                    ts = _parse_ts(r["updated_at"])
+                    if self.watermark is None or ts > self.watermark:
+                        self.watermark = ts
+            if not self.complete:
+                while len(self.rows) > RECENT_ROWS:
+                    del self.rows[next(iter(self.rows))]
+            if changed:
+                self.version += 1
+        return changed
+
+    def _watch_only(self, client: Client) -> bool:
+        """True (and the watermark set to the newest row) if the table is over max_rows."""
+        if self.max_rows is None:
+            return False
+        res = client.table(self.table).select("id", count="exact", head=True).execute()
+        if res.count is not None and res.count <= self.max_rows:
+            return False
+        latest = client.table(self.table).select("updated_at").order("updated_at", desc=True).limit(1).execute().data or []
+        self.watermark = _parse_ts(latest[0]["updated_at"]) if latest and latest[0].get("updated_at") else datetime.now(timezone.utc)
+        log.info("change feed: %s has %s rows (> %s), watching changes only", self.table, res.count, self.max_rows)
+        return True
+
+    def _reconcile(self, client: Client):
+        res = client.table(self.table).select("id", count="exact", head=True).execute()
+        if res.count is None or res.count == len(self.rows):
+            return
+        ids = set()
+        for page in id_pages(lambda: client.table(self.table).select("id"), self.batch_size):
+            ids.update(r["id"] for r in page)
+        with self._lock:
+            gone = [i for i in self.rows if i not in ids]
+            for i in gone:
+                del self.rows[i]
+            if gone:
+                self.version += 1
+
+    def poll(self, client: Client) -> int:
+        """Patch in rows changed since the last poll. Returns the number of rows changed."""
+        with self._poll_lock:
+            if not self.loaded and self._watch_only(client):
+                # not mirrored: watch from the newest row on. The overlap window behind
+                # it can be the whole table when one bulk write stamped every row
+                self.complete = False
+                self.loaded = True
+                return 0
+            since = self.watermark - timedelta(seconds=self.overlap) if self.watermark else None
+            changed = self._apply(self._fetch_since(client, since))
+            self.loaded = True
+            if self.complete and time.monotonic() - self._reconciled > self.reconcile_every:
+                self._reconciled = time.monotonic()
+                self._reconcile(client)
+            return changed
+
+    def ensure_loaded(self, client: Client):
+        """Block until the initial load is done; concurrent callers share one fetch."""
+        if not self.loaded:
+            with self._poll_lock:
+                if not self.loaded:
+                    self.poll(client)
+
+    def get(self, rid: str) -> Optional[dict]:
+        with self._lock:
+            return self.rows.get(rid)
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            return list(self.rows.values())
+
+
+class ChangeFeed:
+    def __init__(self, client_factory: Callable[[], Client], interval: float = 5.0, max_rows: Optional[int] = None):
+        self.client_factory = client_factory
+        self.interval = interval
+        self.products = TableMirror("staging_products", LIST_COLUMNS, max_rows=max_rows)
+        self.assets = TableMirror("staging_assets", ASSET_COLUMNS, max_rows=max_rows)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def version(self) -> int:
+        return self.products.version + self.assets.version
+
+    def _loop(self):
+        client = self.client_factory()
+        while not self._stop.is_set():
+            for m in (self.products, self.assets):
+                try:
+                    m.poll(client)
+                except Exception:
+                    log.exception("change feed: polling %s failed", m.table)
+            self._stop.wait(self.interval)
+
+    def start(self) -> "ChangeFeed":
+        if not self._thread:
+            self._thread = threading.Thread(target=self._loop, daemon=True, name="change-feed")
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+@lru_cache(maxsize=1)
+def change_feed() -> ChangeFeed:
+    """
+    Process-wide feed, started on first use (interval: CHANGE_FEED_INTERVAL
+    seconds; tables over CATALOG_MIRROR_MAX_ROWS rows are watched, not mirrored).
+    """
+    from supabase_client import sb
+
+    return ChangeFeed(
+        sb,
+        interval=float(os.getenv("CHANGE_FEED_INTERVAL", "5")),
+        max_rows=int(os.getenv("CATALOG_MIRROR_MAX_ROWS", "200000")),
+    ).start()
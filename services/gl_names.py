@@ -0,0 +1,92 @@
+# services/gl_names.py
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+# GL lookup tables keyed by a unique `name` column.
+# INSERT ... ON CONFLICT (name) needs a unique index on name:
+#   CREATE UNIQUE INDEX IF NOT EXISTS manufacturers_name_key ON manufacturers(name);
+#   CREATE UNIQUE INDEX IF NOT EXISTS categories_name_key ON categories(name);
+NAMED_TABLES = ("manufacturers", "categories")
+
+
+class NameCache:
+    """Thread-safe, size-bounded LRU of GL name -> id."""
+
+    def __init__(self, maxsize: int = 5000):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str) -> Optional[object]:
+        with self._lock:
+            if name in self._data:
+                self._data.move_to_end(name)
+                self.hits += 1
+                return self._data[name]
+            self.misses += 1
+            return None
+
+    def update(self, mapping: Dict[str, object]):
+        with self._lock:
+            for name, id_ in mapping.items():
+                self._data[name] = id_
+                self._data.move_to_end(name)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_caches = {t: NameCache(int(os.getenv("GL_NAME_CACHE_SIZE", "5000"))) for t in NAMED_TABLES}
+
+
+def name_cache(table: str) -> NameCache:
+    return _caches[table]
+
+
+def resolve_names(cur, table: str, names: Iterable[Optional[str]]) -> Dict[str, object]:
+    """
+    name -> id for every non-empty name, with at most two statements:
+    one SELECT ... = ANY for cache misses, one INSERT ... ON CONFLICT ... RETURNING
+    for names GL has never seen (race-free when two promotions add the same name).
+    The cache is NOT updated here; call name_cache(table).update() after commit so a
+    rolled-back insert never leaves a dangling id behind.
+    """
+    if table not in NAMED_TABLES:
+        raise ValueError(f"unknown GL name table: {table}")
+    cache = name_cache(table)
+
+    out: Dict[str, object] = {}
+    missing = []
+    for n in dict.fromkeys(n for n in names if n):
+        id_ = cache.get(n)
+        if id_ is None:
+            missing.append(n)
+        else:
+            out[n] = id_
+    if not missing:
+        return out
+
+    cur.execute(f"SELECT name, id FROM {table} WHERE name = ANY(%s)", (missing,))
+    out.update(dict(cur.fetchall()))
+
+    new = [n for n in missing if n not in out]
+    if new:
+        # DO UPDATE (a no-op) instead of DO NOTHING so RETURNING also yields rows that
+        # a concurrent promotion inserted first
+        cur.execute(
+            f"""
+            INSERT INTO {table}(name) SELECT unnest(%s::text[])
+            ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+            RETURNING name, id
+            """,
+            (new,),
+        )
+        out.update(dict(cur.fetchall()))
+    return out
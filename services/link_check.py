@@ -0,0 +1,203 @@
+# services/link_check.py
+"""
+Concurrent HEAD checks for asset URLs.
+- Keep-alive httpx.AsyncClient per host, shared by every URL on that host
+- Global concurrency limit plus per-host concurrency and request spacing
+  (0.2 s between requests to one host by default)
+- 429 Too Many Requests pauses the whole host for its Retry-After (capped)
+  and the URL is retried; a URL still rate limited is reported, not cached
+- HEAD first; hosts that reject HEAD get a 1-byte ranged GET
+- Process-wide result cache keyed by URL with a TTL; expired entries are
+  revalidated with If-None-Match / If-Modified-Since (a 304 is cheap)
+"""
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+USER_AGENT = "A360-Curation-LinkCheck/1.0"
+# statuses that usually mean "this host does not like HEAD", not "the file is gone"
+HEAD_UNSUPPORTED = {403, 405, 501}
+RATE_LIMITED = 429
+RATE_LIMIT_RETRIES = 2
+DEFAULT_RETRY_AFTER = 5.0  # seconds, when a 429 carries no usable Retry-After
+MAX_RETRY_AFTER = 60.0
+
+
+class LinkCache:
+    """url -> last result (status, ok, etag, last_modified, checked_at)."""
+
+    def __init__(self, ttl: float = 6 * 3600, maxsize: int = 200_000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[dict]:
+        with self._lock:
+            return self._data.get(url)
+
+    def fresh(self, url: str) -> Optional[dict]:
+        r = self.get(url)
+        if r and time.time() - r["checked_at"] < self.ttl:
+            return r
+        return None
+
+    def put(self, result: dict):
+        with self._lock:
+            if len(self._data) >= self.maxsize and result["url"] not in self._data:
+                # drop the oldest ~10% in one go rather than per insert
+                for url, _ in sorted(self._data.items(), key=lambda kv: kv[1]["checked_at"])[: self.maxsize // 10 or 1]:
+                    del self._data[url]
+            self._data[result["url"]] = result
+
+
+_cache = LinkCache(ttl=float(os.getenv("LINK_CHECK_TTL", str(6 * 3600))))
+
+
+def link_cache() -> LinkCache:
+    return _cache
+
+
+class _HostLimiter:
+    """At most `concurrency` in-flight requests per host, spaced `interval` seconds apart."""
+
+    def __init__(self, concurrency: int, interval: float):
+        self.sem = asyncio.Semaphore(concurrency)
+        self.interval = interval
+        self.lock = asyncio.Lock()
+        self.next_at = 0.0
+
+    async def __aenter__(self):
+        await self.sem.acquire()
+        async with self.lock:
+            now = time.monotonic()
+            wait = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def __aexit__(self, *exc):
+        self.sem.release()
+
+    async def backoff(self, seconds: float):
+        """Hold every later request to this host for `seconds` (host answered 429)."""
+        async with self.lock:
+            self.next_at = max(self.next_at, time.monotonic() + seconds)
+
+
+def _retry_after(headers) -> float:
+    v = (headers or {}).get("retry-after")
+    try:
+        seconds = float(v)
+    except (TypeError, ValueError):
+        try:
+            seconds = (parsedate_to_datetime(v) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            seconds = DEFAULT_RETRY_AFTER
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+def _result(url: str, status: Optional[int], error: Optional[str] = None, headers=None) -> dict:
+    headers = headers or {}
+    return {
+        "url": url,
+        "ok": status is not None and 200 <= status < 400,
+        "status": status,
+        "error": error,
+        "etag": headers.get("etag"),
+        "last_modified": headers.get("last-modified"),
+        "retry_after": _retry_after(headers) if status == RATE_LIMITED else None,
+        "checked_at": time.time(),
+    }
+
+
+async def _check_one(http: httpx.AsyncClient, url: str, prior: Optional[dict]) -> dict:
+    cond = {}
+    if prior and prior["ok"]:
+        if prior.get("etag"):
+            cond["If-None-Match"] = prior["etag"]
+        if prior.get("last_modified"):
+            cond["If-Modified-Since"] = prior["last_modified"]
+    try:
+        r = await http.head(url, headers=cond)
+        if r.status_code == 304 and prior:
+            return {**prior, "checked_at": time.time()}
+        if r.status_code in HEAD_UNSUPPORTED:
+            async with http.stream("GET", url, headers={"Range": "bytes=0-0", **cond}) as g:
+                r = g
+        if r.status_code == 304 and prior:
+            return {**prior, "checked_at": time.time()}
+        return _result(url, r.status_code, headers=r.headers)
+    except httpx.HTTPError as e:
+        return _result(url, None, f"{type(e).__name__}: {e}")
+
+
+async def check_urls_async(
+    urls: Iterable[str],
+    concurrency: int = 100,
+    per_host: int = 4,
+    per_host_interval: float = 0.2,
+    timeout: float = 10.0,
+    cache: Optional[LinkCache] = None,
+) -> Dict[str, dict]:
+    cache = cache or _cache
+    out: Dict[str, dict] = {}
+    todo: List[str] = []
+    for u in dict.fromkeys(u for u in urls if u):
+        hit = cache.fresh(u)
+        if hit:
+            out[u] = hit
+        elif not u.lower().startswith(("http://", "https://")):
+            out[u] = _result(u, None, "unsupported URL scheme")
+        else:
+            todo.append(u)
+    if not todo:
+        return out
+
+    gate = asyncio.Semaphore(concurrency)
+    hosts: Dict[str, _HostLimiter] = {}
+    clients: Dict[str, httpx.AsyncClient] = {}
+
+    def client_for(host: str) -> httpx.AsyncClient:
+        # one small keep-alive pool per host: connections are only reusable per host
+        # anyway, and httpcore's pool bookkeeping gets slow with hundreds of
+        # connections in a single pool
+        if host not in clients:
+            clients[host] = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=per_host, max_keepalive_connections=per_host),
+                timeout=timeout,
+                follow_redirects=True,
+                headers={"User-Agent": USER_AGENT},
+            )
+        return clients[host]
+
+    async def run(u: str):
+        host = urlsplit(u).netloc.lower()
+        limiter = hosts.setdefault(host, _HostLimiter(per_host, per_host_interval))
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            async with limiter, gate:
+                res = await _check_one(client_for(host), u, cache.get(u))
+            if res["status"] != RATE_LIMITED or attempt == RATE_LIMIT_RETRIES:
+                break
+            await limiter.backoff(res["retry_after"])
+        if res["status"] != RATE_LIMITED:
+            cache.put(res)  # a rate-limited URL says nothing about the file; check it next time
+        out[u] = res
+
+    try:
+        await asyncio.gather(*(run(u) for u in todo))
+    finally:
+        await asyncio.gather(*(c.aclose() for c in clients.values()))
+    return out
+
+
+def check_urls(urls: Iterable[str], **kwargs) -> Dict[str, dict]:
+    """Sync entry point (Streamlit scripts, workers): url -> result."""
+    return asyncio.run(check_urls_async(urls, **kwargs))
@@ -0,0 +1,49 @@
+# services/metrics.py
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+REVIEW_STATUSES = ["pending", "in_review", "approved", "rejected"]
+
+
+def dashboard_metrics(client: Client) -> Dict[str, Any]:
+    """
+    Grouped counts for the Dashboard in a single round trip.
+    Backed by the dashboard_metrics() RPC (sql/001_dashboard_metrics.sql), so the
+    payload size stays constant no matter how many staging rows there are.
+    """
+    data = client.rpc("dashboard_metrics").execute().data or {}
+
+    by_status = data.get("review_status") or {}
+    assets = data.get("assets") or {}
+    severity = data.get("severity") or {}
+
+    return {
+        "total_products": int(data.get("total_products") or 0),
+        "review_status": {s: int(by_status.get(s) or 0) for s in REVIEW_STATUSES},
+        "assets": {
+            "kept": int(assets.get("kept") or 0),
+            "promoted": int(assets.get("promoted") or 0),
+        },
+        "severity": {
+            "warning": int(severity.get("warning") or 0),
+            "error": int(severity.get("error") or 0),
+        },
+    }
+
+
+def manufacturer_ranking(client: Client, limit: int = 10, status: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Top `limit` manufacturers by product count, largest first, plus one "Other"
+    row (rank None) for the remainder. `status` restricts the ranking to one
+    review status. Grouped and cut server-side by rpc('manufacturer_ranking').
+    """
+    rows = client.rpc("manufacturer_ranking", {"p_limit": limit, "p_status": status}).execute().data or []
+    return [
+        {"rank": r.get("rank"), "manufacturer": r.get("manufacturer") or "—", "count": int(r.get("n") or 0)}
+        for r in rows
+    ]
@@ -0,0 +1,362 @@
+# services/perf.py
+"""
+Timing layer for PostgREST (sb()) queries, GL psycopg2 cursors and page runs.
+
+Every sample records kind ("postgrest" | "gl" | "page"), the target (e.g.
+"select staging_products", "rpc dashboard_metrics", "INSERT INTO products"),
+the calling line in the app ("pages/Products.py:63"), the page being rendered,
+latency, row count and response bytes. Samples are kept in a bounded
+in-process ring buffer and summarized into percentiles per site and per page
+(pages/Performance.py).
+
+Optional exporters (env):
+    PERF_EXPORT_FILE       append every sample as one JSON line
+    PERF_OTEL=1            record OpenTelemetry histograms through the global MeterProvider
+    PERF_PROMETHEUS_PORT   serve Prometheus histograms on this port (needs prometheus-client)
+    PERF_INSTRUMENT=0      turn the PostgREST/GL wrappers off
+    PERF_MAX_SAMPLES       ring buffer size (default 20000, a few MiB)
+"""
+import heapq
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+_page: ContextVar[Optional[str]] = ContextVar("perf_page", default=None)
+_page_started: ContextVar[float] = ContextVar("perf_page_started", default=0.0)
+_current: ContextVar[Optional[dict]] = ContextVar("perf_current", default=None)
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+# frames in these files are the instrumentation itself, not the query site
+_SKIP_FILES = {
+    os.path.join(_ROOT, "services", "perf.py"),
+    os.path.join(_ROOT, "services", "query_cache.py"),
+}
+
+
+def enabled() -> bool:
+    return os.getenv("PERF_INSTRUMENT", "1").strip() not in ("0", "false", "no")
+
+
+def call_site() -> str:
+    """First app frame (relative path:line) outside the instrumentation and libraries."""
+    f = sys._getframe(1)
+    while f is not None:
+        path = f.f_code.co_filename
+        if path.startswith(_ROOT) and path not in _SKIP_FILES and "site-packages" not in path:
+            return f"{path[len(_ROOT):]}:{f.f_lineno}"
+        f = f.f_back
+    return "?"
+
+
+def _percentile(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[k]
+
+
+# stored sample layout; a tuple of these is ~1/3 the size of the sample dict
+_FIELDS = ("ts", "kind", "target", "caller", "page", "ms", "rows", "bytes", "error")
+_TS, _MS, _ROWS, _BYTES = 0, 5, 6, 7
+
+
+class PerfRecorder:
+    """
+    Process-wide sample buffer.
+    - Bounded (`maxlen` samples, ~200 bytes each, stored as tuples with interned
+      labels); summaries look back `since` seconds, newest first, and stop at
+      the cutoff instead of copying the whole buffer
+    - Exporters are called with every sample, outside the buffer lock
+    """
+
+    def __init__(self, maxlen: int = 20_000):
+        self.samples: deque = deque(maxlen=maxlen)
+        self.exporters: List[Callable[[dict], None]] = []
+        self._lock = threading.Lock()
+
+    def record(self, sample: dict):
+        row = tuple(
+            sys.intern(v) if isinstance(v, str) else v
+            for v in (sample.get(k) for k in _FIELDS)
+        )
+        with self._lock:
+            self.samples.append(row)
+        for export in self.exporters:
+            try:
+                export(sample)
+            except Exception:
+                pass  # an exporter must never break a page
+
+    def _window(self, since: float) -> List[tuple]:
+        cutoff = time.time() - since
+        with self._lock:
+            if not self.samples or self.samples[0][_TS] >= cutoff:
+                return list(self.samples)
+            out = []
+            for row in reversed(self.samples):
+                if row[_TS] < cutoff:
+                    break
+                out.append(row)
+        out.reverse()
+        return out
+
+    def recent(self, since: float = 3600.0) -> List[dict]:
+        return [dict(zip(_FIELDS, row)) for row in self._window(since)]
+
+    def slowest(self, since: float = 3600.0, n: int = 20, kind: Optional[str] = None) -> List[dict]:
+        """The `n` slowest query samples (no "page" runs), slowest first."""
+        rows = (r for r in self._window(since) if r[1] != "page" and (not kind or r[1] == kind))
+        return [dict(zip(_FIELDS, r)) for r in heapq.nlargest(n, rows, key=lambda r: r[_MS])]
+
+    def summary(self, since: float = 3600.0, by=("kind", "target", "caller"), kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Percentiles grouped by `by`, slowest p95 first."""
+        idx = [_FIELDS.index(k) for k in by]
+        groups: Dict[tuple, List[tuple]] = {}
+        for r in self._window(since):
+            if kind and r[1] != kind:
+                continue
+            groups.setdefault(tuple(r[i] for i in idx), []).append(r)
+        out = []
+        for key, rs in groups.items():
+            ms = sorted(r[_MS] for r in rs)
+            rows = [r[_ROWS] for r in rs if r[_ROWS] is not None]
+            nbytes = [r[_BYTES] for r in rs if r[_BYTES] is not None]
+            out.append({
+                **dict(zip(by, key)),
+                "n": len(rs),
+                "p50_ms": _percentile(ms, 0.50),
+                "p95_ms": _percentile(ms, 0.95),
+                "p99_ms": _percentile(ms, 0.99),
+                "max_ms": ms[-1],
+                "total_ms": sum(ms),
+                "avg_rows": sum(rows) / len(rows) if rows else None,
+                "bytes": sum(nbytes) if nbytes else None,
+            })
+        out.sort(key=lambda r: r["p95_ms"], reverse=True)
+        return out
+
+
+@contextmanager
+def timed(kind: str, target: str, caller: Optional[str] = None):
+    """Time the block as one sample; set sample["rows"] / ["bytes"] inside it."""
+    sample = {
+        "ts": time.time(),
+        "kind": kind,
+        "target": target,
+        "caller": caller or call_site(),
+        "page": _page.get() or "(background)",
+        "rows": None,
+        "bytes": None,
+        "error": None,
+    }
+    token = _current.set(sample)
+    t0 = time.perf_counter()
+    try:
+        yield sample
+    except Exception as e:
+        sample["error"] = type(e).__name__
+        raise
+    finally:
+        sample["ms"] = (time.perf_counter() - t0) * 1000
+        _current.reset(token)
+        recorder().record(sample)
+
+
+def track_page(name: str):
+    """Call at the top of a page: later samples in this script run are attributed to it."""
+    _page.set(name)
+    _page_started.set(time.perf_counter())
+
+
+def page_done():
+    """Call at the end of a page: records the whole script run as one "page" sample."""
+    name, started = _page.get(), _page_started.get()
+    if not name or not started:
+        return
+    recorder().record({
+        "ts": time.time(),
+        "kind": "page",
+        "target": name,
+        "caller": name,
+        "page": name,
+        "ms": (time.perf_counter() - started) * 1000,
+        "rows": None,
+        "bytes": None,
+        "error": None,
+    })
+    _page_started.set(0.0)
+
+
+def page_rerun():
+    """st.rerun() for tracked pages: the rerun ends the script before page_done() runs."""
+    import streamlit as st
+
+    page_done()
+    st.rerun()
+
+
+def page_stop():
+    """st.stop() for tracked pages, recording the run first like page_rerun()."""
+    import streamlit as st
+
+    page_done()
+    st.stop()
+
+
+# ── PostgREST ────────────────────────────────────────────────────────────────
+def _count_bytes(response):
+    # httpx response hook: attribute the body size to the sample being timed
+    sample = _current.get()
+    if sample is not None:
+        sample["bytes"] = (sample["bytes"] or 0) + len(response.read())
+
+
+class _TimedBuilder:
+    """Proxies a postgrest request builder; execute() is recorded as one sample."""
+
+    def __init__(self, builder, table: str, op: Optional[str] = None):
+        self._b = builder
+        self._table = table
+        self._op = op
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._b, name)
+        op = self._op or name
+        if not callable(attr):
+            return _TimedBuilder(attr, self._table, op) if hasattr(attr, "execute") else attr
+
+        def call(*args, **kwargs):
+            res = attr(*args, **kwargs)
+            return _TimedBuilder(res, self._table, op) if hasattr(res, "execute") else res
+
+        return call
+
+    def execute(self):
+        with timed("postgrest", f"{self._op or 'query'} {self._table}") as s:
+            res = self._b.execute()
+            data = getattr(res, "data", None)
+            s["rows"] = len(data) if isinstance(data, list) else (0 if data is None else 1)
+            return res
+
+
+class InstrumentedClient:
+    """Supabase client whose table()/rpc() requests are timed; everything else passes through."""
+
+    def __init__(self, client):
+        self.client = client
+        try:
+            hooks = client.postgrest.session.event_hooks
+            if _count_bytes not in hooks["response"]:
+                hooks["response"].append(_count_bytes)
+        except Exception:
+            pass  # payload bytes are optional
+
+    def table(self, name: str) -> _TimedBuilder:
+        return _TimedBuilder(self.client.table(name), name)
+
+    def rpc(self, fn: str, *args, **kwargs) -> _TimedBuilder:
+        return _TimedBuilder(self.client.rpc(fn, *args, **kwargs), fn, "rpc")
+
+    def __getattr__(self, name: str):
+        return getattr(self.client, name)
+
+
+def instrument(client):
+    return InstrumentedClient(client) if enabled() else client
+
+
+# ── GL (psycopg2) ────────────────────────────────────────────────────────────
+def _sql_target(sql) -> str:
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    words = " ".join(str(sql).split()).split(" ")
+    # "INSERT INTO products (...) VALUES ..." -> "INSERT INTO products"
+    return " ".join(words[:3])[:80]
+
+
+def timed_cursor_factory():
+    """cursor_factory for psycopg2 connections whose execute() calls are recorded as "gl" samples."""
+    from psycopg2.extensions import cursor
+
+    class TimedCursor(cursor):
+        def execute(self, query, vars=None):
+            with timed("gl", _sql_target(query)) as s:
+                r = super().execute(query, vars)
+                s["rows"] = self.rowcount if self.rowcount >= 0 else None
+                return r
+
+        def executemany(self, query, vars_list):
+            with timed("gl", _sql_target(query)) as s:
+                r = super().executemany(query, vars_list)
+                s["rows"] = self.rowcount if self.rowcount >= 0 else None
+                return r
+
+    return TimedCursor
+
+
+# ── exporters ────────────────────────────────────────────────────────────────
+class FileExporter:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, sample: dict):
+        line = json.dumps(sample, default=str) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class OTelExporter:
+    def __init__(self):
+        from opentelemetry import metrics
+
+        meter = metrics.get_meter("a360.perf")
+        self.duration = meter.create_histogram("a360.query.duration", unit="ms")
+        self.rows = meter.create_histogram("a360.query.rows")
+        self.bytes = meter.create_histogram("a360.query.bytes", unit="By")
+
+    def __call__(self, s: dict):
+        attrs = {"kind": s["kind"], "target": s["target"], "caller": s["caller"], "page": s["page"]}
+        self.duration.record(s["ms"], attrs)
+        if s.get("rows") is not None:
+            self.rows.record(s["rows"], attrs)
+        if s.get("bytes") is not None:
+            self.bytes.record(s["bytes"], attrs)
+
+
+class PrometheusExporter:
+    def __init__(self, port: int):
+        try:
+            from prometheus_client import Histogram, start_http_server
+        except ImportError:
+            raise RuntimeError("PERF_PROMETHEUS_PORT is set but prometheus-client is not installed.")
+        labels = ["kind", "target", "page"]
+        self.duration = Histogram("a360_query_duration_seconds", "Query / page latency", labels)
+        self.nbytes = Histogram("a360_query_bytes", "Response payload bytes", labels, buckets=(1e3, 1e4, 1e5, 1e6, 1e7))
+        start_http_server(port)
+
+    def __call__(self, s: dict):
+        labels = (s["kind"], s["target"], s["page"])
+        self.duration.labels(*labels).observe(s["ms"] / 1000)
+        if s.get("bytes") is not None:
+            self.nbytes.labels(*labels).observe(s["bytes"])
+
+
+@lru_cache(maxsize=1)
+def recorder() -> PerfRecorder:
+    """Process-wide recorder with the exporters configured in env."""
+    rec = PerfRecorder(maxlen=int(os.getenv("PERF_MAX_SAMPLES", "20000")))
+    if os.getenv("PERF_EXPORT_FILE"):
+        rec.exporters.append(FileExporter(os.environ["PERF_EXPORT_FILE"]))
+    if os.getenv("PERF_OTEL", "").strip() in ("1", "true", "yes"):
+        rec.exporters.append(OTelExporter())
+    if os.getenv("PERF_PROMETHEUS_PORT"):
+        rec.exporters.append(PrometheusExporter(int(os.environ["PERF_PROMETHEUS_PORT"])))
+    return rec
@@ -0,0 +1,253 @@
+# services/products.py
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from services.query_cache import invalidate_table
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+LIST_COLUMNS = "id, product_name, manufacturer, category, completeness_score, review_status, created_at, updated_at"
+
+# (sort key, id) of the last row on a page; the next page starts strictly after it.
+# The sort key is updated_at when browsing and the search rank when searching.
+Cursor = Tuple[Any, str]
+
+SEARCH_MIN_CHARS = 2
+IN_CHUNK = 200  # ids per in.() filter, keeps request URLs short
+# PostgREST max-rows on hosted Supabase: longer responses are cut short without
+# an error, so bulk reads page until an empty page instead of trusting a short one
+MAX_ROWS = 1000
+
+
+def quote_value(v) -> str:
+    # PostgREST needs reserved chars (, . : ( ) ") inside filter values double-quoted
+    s = str(v).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{s}"'
+
+
+def keyset_filter(after: Cursor) -> str:
+    """or= expression for rows sorted after `after` in (updated_at desc, id desc) order."""
+    ts, rid = after
+    return f"updated_at.lt.{quote_value(ts)},and(updated_at.eq.{quote_value(ts)},id.lt.{quote_value(rid)})"
+
+
+def normalize_query(q: Optional[str]) -> Optional[str]:
+    """Collapse whitespace/case; queries shorter than SEARCH_MIN_CHARS are ignored."""
+    q = " ".join((q or "").split()).lower()
+    return q if len(q) >= SEARCH_MIN_CHARS else None
+
+
+def id_pages(query: Callable[[], Any], page_size: int = MAX_ROWS) -> Iterator[List[dict]]:
+    """Rows of query() (a fresh filtered select, including id) in ascending id keyset pages."""
+    after = None
+    while True:
+        qrb = query()
+        if after:
+            qrb = qrb.gt("id", after)
+        page = qrb.order("id").limit(page_size).execute().data or []
+        if not page:
+            return
+        yield page
+        after = page[-1]["id"]
+
+
+def changed_pages(client: Client, table: str, columns: str, since: Optional[datetime], page_size: int = MAX_ROWS) -> Iterator[List[dict]]:
+    """Rows with updated_at >= since (all rows without one), in ascending (updated_at, id) keyset pages."""
+    after = None
+    while True:
+        qrb = client.table(table).select(columns)
+        if after:
+            ts, rid = after
+            qrb = qrb.or_(f"updated_at.gt.{quote_value(ts)},and(updated_at.eq.{quote_value(ts)},id.gt.{quote_value(rid)})")
+        elif since:
+            qrb = qrb.gte("updated_at", since.isoformat())
+        page = qrb.order("updated_at").order("id").limit(page_size).execute().data or []
+        if not page:
+            return
+        yield page
+        after = (page[-1]["updated_at"], page[-1]["id"])
+
+
+def select_in_chunks(client: Client, table: str, columns: str, column: str, ids: List[str], **eq) -> List[dict]:
+    """
+    Rows of `table` whose `column` is in `ids`, IN_CHUNK ids per filter. Each
+    chunk is read in id pages (`columns` must include id): 200 products can
+    have more assets than one response carries.
+    """
+    out = []
+    for i in range(0, len(ids), IN_CHUNK):
+        chunk = ids[i:i + IN_CHUNK]
+
+        def query():
+            qrb = client.table(table).select(columns).in_(column, chunk)
+            for k, v in eq.items():
+                qrb = qrb.eq(k, v)
+            return qrb
+
+        for page in id_pages(query):
+            out.extend(page)
+    return out
+
+
+def apply_filters(qrb, manufacturer: Optional[str] = None, status: Optional[str] = None):
+    if manufacturer:
+        qrb = qrb.eq("manufacturer", manufacturer)
+    if status:
+        qrb = qrb.eq("review_status", status)
+    return qrb
+
+
+def search_products(
+    client: Client,
+    q: str,
+    manufacturer: Optional[str] = None,
+    status: Optional[str] = None,
+    after: Optional[Cursor] = None,
+    limit: int = 21,
+) -> list:
+    """
+    Ranked prefix search via rpc('search_products') (sql/003_product_search.sql).
+    Broad queries rank their 1000 most recently updated matches plus the
+    products whose name starts with the query; rows carry `truncated` when
+    older matches were left out (sql/014_search_candidate_cap.sql).
+    """
+    params = {
+        "p_query": q,
+        "p_manufacturer": manufacturer,
+        "p_status": status,
+        "p_after_rank": after[0] if after else None,
+        "p_after_id": after[1] if after else None,
+        "p_limit": limit,
+    }
+    return client.rpc("search_products", params).execute().data or []
+
+
+def product_page(
+    client: Client,
+    manufacturer: Optional[str] = None,
+    status: Optional[str] = None,
+    q: Optional[str] = None,
+    after: Optional[Cursor] = None,
+    page_size: int = 20,
+    count: Optional[str] = "estimated",
+) -> Dict[str, Any]:
+    """
+    One bounded page of staging_products.
+    - Browsing: newest first, keyset on (updated_at, id); cost does not grow with page number
+    - Searching (`q`): ranked full-text matches, keyset on (rank, id); no total
+    - Fetches page_size + 1 rows to know whether a next page exists
+    - `count` is passed to PostgREST (exact | planned | estimated | None); the total
+      comes back in the Content-Range header, not as rows
+    Returns {"rows", "total", "next", "truncated"} where `next` is the cursor for the
+    following page and `truncated` says a broad search ranked only part of its matches.
+    """
+    q = normalize_query(q)
+    if q:
+        rows = search_products(client, q, manufacturer, status, after, limit=page_size + 1)
+        total, key = None, "rank"
+        truncated = bool(rows and rows[0].get("truncated"))
+    else:
+        qrb = client.table("staging_products").select(LIST_COLUMNS, count=count)
+        qrb = apply_filters(qrb, manufacturer, status)
+        if after:
+            qrb = qrb.or_(keyset_filter(after))
+        qrb = qrb.order("updated_at", desc=True).order("id", desc=True).limit(page_size + 1)
+        res = qrb.execute()
+        rows = res.data or []
+        total, key = getattr(res, "count", None), "updated_at"
+        truncated = False
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    return {
+        "rows": rows,
+        "total": total,
+        "next": (rows[-1][key], rows[-1]["id"]) if has_more else None,
+        "truncated": truncated,
+    }
+
+
+# ----------------- bulk edits -----------------
+
+BULK_FIELDS = ("review_status", "manufacturer", "category", "regulatory_status")
+
+
+def bulk_update_products(client: Client, ids: List[str], fields: Dict[str, Any], actor: str = "curator") -> int:
+    """
+    Apply the same field values to many products in one request.
+    Goes through rpc('bulk_update_products') (sql/006_bulk_review.sql), which also
+    writes one staging_review_audit row per changed field. Returns rows updated.
+    """
+    unknown = set(fields) - set(BULK_FIELDS)
+    if unknown:
+        raise ValueError(f"Fields not editable in bulk: {', '.join(sorted(unknown))}")
+    ids = list(dict.fromkeys(ids))
+    if not ids or not fields:
+        return 0
+    n = client.rpc("bulk_update_products", {"p_ids": ids, "p_fields": fields, "p_actor": actor}).execute().data
+    invalidate_table("staging_products")
+    return int(n or 0)
+
+
+# ----------------- facets -----------------
+
+def latest_update(client: Client) -> Optional[str]:
+    """max(updated_at) of staging_products — a one-row probe on the updated_at index."""
+    rows = (
+        client.table("staging_products")
+        .select("updated_at")
+        .order("updated_at", desc=True)
+        .limit(1)
+        .execute()
+        .data
+        or []
+    )
+    return rows[0]["updated_at"] if rows else None
+
+
+def manufacturer_facets(client: Client) -> Dict[str, int]:
+    """{manufacturer: product count}, grouped server-side by rpc('manufacturer_facets')."""
+    rows = client.rpc("manufacturer_facets").execute().data or []
+    return {r["manufacturer"]: int(r["n"]) for r in rows}
+
+
+class FacetCache:
+    """
+    Process-wide manufacturer facet list (hold it in st.cache_resource).
+    - At most one watermark probe per `ttl` seconds
+    - Re-aggregates only when max(updated_at) moved since the last load
+    - Thread-safe: concurrent sessions share one refresh
+    Per-row deltas alone cannot decrement the count of a row's previous
+    manufacturer, so a moved watermark triggers one grouped RPC instead.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._watermark: Optional[str] = None
+        self._checked = 0.0
+        self._loaded = False
+
+    def get(self, client: Client) -> Dict[str, int]:
+        with self._lock:
+            now = time.monotonic()
+            if self._loaded and now - self._checked < self.ttl:
+                return self._counts
+            self._checked = now
+            mark = latest_update(client)
+            if not self._loaded or mark != self._watermark:
+                self._counts = manufacturer_facets(client)
+                self._watermark = mark
+                self._loaded = True
+            return self._counts
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
@@ -0,0 +1,211 @@
+# services/promotion_jobs.py
+"""
+Background promotion jobs on top of services/promotion.promote_batch.
+
+Curators enqueue (at most one active job per product); workers lease due jobs
+from staging_promotion_log (sql/005_promotion_queue.sql,
+sql/012_promotion_queue_dedupe.sql), promote them in small batches and record the
+outcome on the same row, which is what the pages poll.
+
+Run workers as their own process (Procfile `worker`):
+    python -m services.promotion_jobs
+or inside the Streamlit process with PROMOTION_WORKERS_INPROCESS=1.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional
+
+from services.promotion import promote_batch
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+log = logging.getLogger(__name__)
+
+ACTIVE = ("queued", "running")
+RETRY_BASE_SECONDS = 30
+
+
+def enqueue_promotions(
+    client: Client,
+    staging_product_ids: Iterable[str],
+    promoted_by: str = "curator",
+    max_attempts: int = 3,
+) -> List[str]:
+    """
+    Queue one promotion job per product; returns the ids of products newly queued.
+    A product with an active (queued/running) job keeps it, whatever was edited
+    since: rpc('enqueue_promotion_jobs') inserts against a unique index on the
+    active job per product (sql/012_promotion_queue_dedupe.sql). The ids go in
+    the request body, so a bulk enqueue has no URL to outgrow.
+    """
+    ids = list(dict.fromkeys(staging_product_ids))
+    if not ids:
+        return []
+    params = {"p_ids": ids, "p_promoted_by": promoted_by, "p_max_attempts": max_attempts}
+    jobs = client.rpc("enqueue_promotion_jobs", params).execute().data or []
+    return [j["staging_product_id"] for j in jobs]
+
+
+def latest_job(client: Client, staging_product_id: str) -> Optional[Dict[str, Any]]:
+    rows = (
+        client.table("staging_promotion_log")
+        .select("id, promotion_status, attempts, max_attempts, error_message, assets_promoted_count, created_at, updated_at")
+        .eq("staging_product_id", staging_product_id)
+        .order("created_at", desc=True)
+        .limit(1)
+        .execute()
+        .data
+        or []
+    )
+    return rows[0] if rows else None
+
+
+def queue_counts(client: Client) -> Dict[str, int]:
+    data = client.rpc("promotion_queue_counts").execute().data or {}
+    return {s: int(data.get(s) or 0) for s in ("queued", "running", "success", "failed")}
+
+
+def run_once(client: Client, worker_id: str, batch_size: int = 5) -> int:
+    """Lease and process one batch of due jobs. Returns the number of jobs handled."""
+    jobs = client.rpc("claim_promotion_jobs", {"p_worker": worker_id, "p_limit": batch_size}).execute().data or []
+    if not jobs:
+        return 0
+
+    pids = [j["staging_product_id"] for j in jobs]
+    # a retry after a crash between the write-back and the status update has nothing
+    # left to do; one after a crash between GL commit and the write-back is safe,
+    # promote_batch finds the GL product by its idempotency key
+    already = {
+        p["id"]
+        for p in (client.table("staging_products").select("id").in_("id", pids).eq("promoted_to_gl", True).execute().data or [])
+    }
+    todo = [pid for pid in pids if pid not in already]
+    transient = False
+    try:
+        outcomes, results = promote_batch(client, todo) if todo else ({}, {})
+    except Exception as e:
+        # staging reads failed before any GL work; every job in the batch is retried
+        outcomes, results, transient = {pid: (False, str(e)) for pid in todo}, {}, True
+
+    now = datetime.now(timezone.utc)
+    for job in jobs:
+        pid = job["staging_product_id"]
+        fields: Dict[str, Any] = {"locked_by": None, "locked_at": None, "updated_at": now.isoformat()}
+        if pid in already:
+            fields.update(promotion_status="success", error_message=None)
+        else:
+            ok, msg = outcomes.get(pid, (False, "no outcome"))
+            res = results.get(pid) or {}
+            if ok:
+                fields.update(
+                    promotion_status="success",
+                    gl_product_id=res.get("gl_product_id"),
+                    assets_promoted_count=res.get("assets_promoted_count"),
+                    error_message=None,
+                )
+            elif (transient or pid in results) and job["attempts"] < job["max_attempts"]:
+                # attempted and failed (or never reached GL): retry with backoff. A product
+                # GL committed but staging was not marked is reused by the retry.
+                # "not found" / "not approved" are never attempted and fail right away.
+                delay = RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+                fields.update(
+                    promotion_status="queued",
+                    gl_product_id=res.get("gl_product_id"),
+                    error_message=res.get("error_message") or msg,
+                    next_attempt_at=(now + timedelta(seconds=delay)).isoformat(),
+                )
+            else:
+                fields.update(promotion_status="failed", gl_product_id=res.get("gl_product_id"), error_message=res.get("error_message") or msg)
+        (
+            client.table("staging_promotion_log")
+            .update(fields)
+            .eq("id", job["id"])
+            .eq("locked_by", worker_id)
+            .execute()
+        )
+    return len(jobs)
+
+
+class PromotionWorkers:
+    """`concurrency` threads, each leasing `batch_size` jobs at a time."""
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Client],
+        concurrency: int = 2,
+        batch_size: int = 5,
+        poll_interval: float = 2.0,
+    ):
+        self.client_factory = client_factory
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._prefix = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+    def _loop(self, worker_id: str):
+        client = self.client_factory()
+        while not self._stop.is_set():
+            try:
+                handled = run_once(client, worker_id, self.batch_size)
+            except Exception:
+                log.exception("promotion worker %s: batch failed", worker_id)
+                handled = 0
+            if not handled:
+                self._stop.wait(self.poll_interval)
+
+    def start(self) -> "PromotionWorkers":
+        for i in range(self.concurrency):
+            t = threading.Thread(target=self._loop, args=(f"{self._prefix}:{i}",), daemon=True, name=f"promotion-worker-{i}")
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+
+
+def _from_env(client_factory: Callable[[], Client]) -> PromotionWorkers:
+    return PromotionWorkers(
+        client_factory,
+        concurrency=int(os.getenv("PROMOTION_WORKERS", "2")),
+        batch_size=int(os.getenv("PROMOTION_BATCH_SIZE", "5")),
+        poll_interval=float(os.getenv("PROMOTION_POLL_INTERVAL", "2")),
+    )
+
+
+@lru_cache(maxsize=1)
+def _inprocess_workers() -> PromotionWorkers:
+    from supabase_client import sb
+
+    return _from_env(sb).start()
+
+
+def ensure_inprocess_workers():
+    """Start one worker pool per Streamlit process when PROMOTION_WORKERS_INPROCESS=1."""
+    if os.getenv("PROMOTION_WORKERS_INPROCESS", "").strip() in ("1", "true", "yes"):
+        _inprocess_workers()
+
+
+if __name__ == "__main__":
+    from supabase_client import sb
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    workers = _from_env(sb).start()
+    log.info("promotion workers running (%d threads)", workers.concurrency)
+    try:
+        while True:
+            threading.Event().wait(3600)
+    except KeyboardInterrupt:
+        workers.stop(timeout=30)
@@ -0,0 +1,141 @@
+# services/query_cache.py
+"""
+Read-through cache over the Supabase client.
+
+    client = CachedClient(sb())
+    client.table("staging_products").select("*").eq("id", pid).single().execute()   # miss
+    client.table("staging_products").select("*").eq("id", pid).single().execute()   # hit
+
+- Selects are keyed by table + the full builder chain (filters, columns, order, ...)
+- TTL and LRU bounds per CachedClient
+- insert/update/upsert/delete through any CachedClient bump a process-wide
+  generation for that table, which invalidates every cached read of it in every
+  session; invalidate_table() does the same for writes made elsewhere
+  (RPCs, the raw client). Both only reach this process: another process's
+  writes are seen once the entry's TTL runs out
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+WRITE_METHODS = {"insert", "update", "upsert", "delete"}
+# builder attributes that are properties, not methods (e.g. .not_.is_(...))
+BUILDER_PROPERTIES = {"not_"}
+
+_generations: Dict[str, int] = {}
+_gen_lock = threading.Lock()
+
+
+def invalidate_table(table: str):
+    """Drop cached reads of `table` in every CachedClient of this process."""
+    with _gen_lock:
+        _generations[table] = _generations.get(table, 0) + 1
+
+
+def _generation(table: str) -> int:
+    return _generations.get(table, 0)
+
+
+def _copy(res):
+    # callers may mutate rows; the cached response must stay as fetched
+    out = copy.copy(res)
+    out.data = copy.deepcopy(res.data)
+    return out
+
+
+class _Query:
+    """Records a builder chain and replays it on the real client at execute()."""
+
+    def __init__(self, owner: "CachedClient", table: str):
+        self._owner = owner
+        self._table = table
+        self._chain: list = []
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in BUILDER_PROPERTIES:
+            self._chain.append((name, None, None))
+            return self
+
+        def record(*args, **kwargs):
+            self._chain.append((name, args, kwargs))
+            return self
+
+        return record
+
+    def _build(self):
+        b = self._owner.client.table(self._table)
+        for name, args, kwargs in self._chain:
+            b = getattr(b, name) if args is None else getattr(b, name)(*args, **kwargs)
+        return b
+
+    def _key(self) -> Tuple:
+        return (self._table, repr(self._chain))
+
+    def execute(self):
+        first = self._chain[0][0] if self._chain else None
+        if first in WRITE_METHODS:
+            try:
+                return self._build().execute()
+            finally:
+                invalidate_table(self._table)
+        if first != "select":
+            return self._build().execute()
+        return self._owner._read(self._table, self._key(), self._build)
+
+
+class CachedClient:
+    def __init__(self, client, ttl: float = 30.0, maxsize: int = 256):
+        self.client = client
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple, Tuple[float, int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def rpc(self, *args, **kwargs):
+        # RPCs pass straight through; cache their results where they are used
+        return self.client.rpc(*args, **kwargs)
+
+    def __getattr__(self, name: str):
+        # storage, auth, ... of the underlying client
+        return getattr(self.client, name)
+
+    def _read(self, table: str, key: Tuple, build):
+        now = time.monotonic()
+        gen = _generation(table)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit and hit[1] == gen and now - hit[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy(hit[2])
+            self.misses += 1
+
+        res = build().execute()
+        with self._lock:
+            self._entries[key] = (now, gen, res)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return _copy(res)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+        }
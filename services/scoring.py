@@ -0,0 +1,201 @@
+# services/scoring.py
+"""
+Incremental completeness scoring for staging_products.
+
+Each run reads only products (and assets) whose updated_at moved past the
+watermarks stored in staging_scoring_state, scores them from their fields and
+kept assets, and writes every batch back in one rpc('apply_completeness_scores')
+(sql/010_completeness_scoring.sql): scores, 'completeness' findings in
+staging_validation_log and the advanced watermarks commit together.
+
+Writing a changed score bumps that product's updated_at; the scorer remembers
+the (id, updated_at) pairs it already handled (including the ones its own
+writes produced) and skips them when the overlap window re-reads them, so a
+run after a small edit touches only the edited rows.
+
+    python -m services.scoring            # loop every SCORING_INTERVAL seconds
+    python -m services.scoring --once
+"""
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from services.products import MAX_ROWS, changed_pages, select_in_chunks
+from services.query_cache import invalidate_table
+from services.validators import REQUIRED_FIELDS
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+log = logging.getLogger(__name__)
+
+ENGINE = "completeness"
+SCORE_COLUMNS = (
+    "id, product_name, manufacturer, category, description, indications, contraindications, "
+    "regulatory_status, active_ingredients, completeness_score, updated_at"
+)
+ASSET_COLUMNS = "id, staging_product_id, file_url, content_category"
+
+# points per satisfied check, 100 in total
+WEIGHTS = {
+    "product_name": 20,
+    "manufacturer": 20,
+    "description": 20,
+    "category": 10,
+    "indications": 5,
+    "contraindications": 5,
+    "regulatory_status": 5,
+    "active_ingredients": 5,
+    "kept_assets": 10,
+}
+
+
+def _filled(v) -> bool:
+    if isinstance(v, str):
+        return bool(v.strip())
+    if isinstance(v, (list, tuple)):
+        return any(_filled(x) for x in v)
+    return v is not None
+
+
+def _parse_ts(v: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(v.replace("Z", "+00:00")) if v else None
+
+
+def score_product(prod: dict, kept_assets: List[dict]) -> Tuple[int, List[dict]]:
+    """(completeness score 0-100, findings) for one product and its kept assets."""
+    findings = []
+    score = 0
+    for k in ("product_name", "manufacturer", "description", "category", "indications", "contraindications", "active_ingredients"):
+        if _filled(prod.get(k)):
+            score += WEIGHTS[k]
+        elif k in REQUIRED_FIELDS:
+            findings.append({"severity": "error", "message": f"missing required field: {k}"})
+    if (prod.get("regulatory_status") or "unknown") != "unknown":
+        score += WEIGHTS["regulatory_status"]
+    if kept_assets:
+        score += WEIGHTS["kept_assets"]
+    else:
+        findings.append({"severity": "warning", "message": "no kept assets"})
+    for a in kept_assets:
+        if not _filled(a.get("file_url")):
+            findings.append({"severity": "error", "message": f"kept asset has no file URL: {a['id']}"})
+    return score, findings
+
+
+def _max_ts(rows: List[dict]) -> Optional[str]:
+    return max((r["updated_at"] for r in rows if r.get("updated_at")), key=_parse_ts, default=None)
+
+
+class CompletenessScorer:
+    """
+    Re-scores products changed since the stored watermarks.
+    - `batch_size` products (or assets) per read and per write RPC
+    - `overlap` seconds re-read behind each watermark for late commits;
+      rows whose updated_at did not move since they were handled are skipped
+    """
+
+    def __init__(self, batch_size: int = MAX_ROWS, overlap: float = 5.0):
+        self.batch_size = batch_size
+        self.overlap = overlap
+        # table -> {id: updated_at already handled}; pruned to the overlap window after each run
+        self._seen: Dict[str, Dict[str, datetime]] = {"staging_products": {}, "staging_assets": {}}
+        self._lock = threading.Lock()
+
+    def _state(self, client: Client) -> Tuple[Optional[datetime], Optional[datetime]]:
+        rows = (
+            client.table("staging_scoring_state")
+            .select("products_watermark, assets_watermark")
+            .eq("engine", ENGINE)
+            .execute()
+            .data
+            or []
+        )
+        if not rows:
+            return None, None
+        return _parse_ts(rows[0].get("products_watermark")), _parse_ts(rows[0].get("assets_watermark"))
+
+    def _since(self, wm: Optional[datetime]) -> Optional[datetime]:
+        return wm - timedelta(seconds=self.overlap) if wm else None
+
+    def _score_and_write(self, client: Client, products: List[dict], **watermarks) -> Tuple[int, int]:
+        ids = [p["id"] for p in products]
+        kept: Dict[str, List[dict]] = {i: [] for i in ids}
+        for a in select_in_chunks(client, "staging_assets", ASSET_COLUMNS, "staging_product_id", ids, keep_asset=True):
+            kept.setdefault(a["staging_product_id"], []).append(a)
+        rows = []
+        for p in products:
+            score, findings = score_product(p, kept[p["id"]])
+            rows.append({"id": p["id"], "completeness_score": score, "findings": findings})
+        params = {"p_rows": rows}
+        params.update({f"p_{k}": v for k, v in watermarks.items()})
+        bumped = client.rpc("apply_completeness_scores", params).execute().data or []
+        seen = self._seen["staging_products"]
+        for p in products:
+            seen[p["id"]] = _parse_ts(p.get("updated_at"))
+        for b in bumped:
+            seen[b["scored_id"]] = _parse_ts(b["scored_updated_at"])
+        return len(rows), len(bumped)
+
+    def _prune(self, table: str, watermark: Optional[datetime]):
+        # rows older than the next run's overlap window will not be re-read
+        since = self._since(watermark)
+        if since:
+            seen = self._seen[table]
+            for k in [k for k, t in seen.items() if not t or t < since]:
+                del seen[k]
+
+    def run(self, client: Client) -> dict:
+        """One incremental pass. Returns {"scored", "score_changes", "skipped", "ms"}."""
+        with self._lock:
+            t0 = time.perf_counter()
+            products_wm, assets_wm = self._state(client)
+            scored = changed = skipped = 0
+            done = set()
+
+            for page in changed_pages(client, "staging_products", SCORE_COLUMNS, self._since(products_wm), self.batch_size):
+                seen = self._seen["staging_products"]
+                todo = [p for p in page if p["id"] not in done and seen.get(p["id"]) != _parse_ts(p.get("updated_at"))]
+                skipped += len(page) - len(todo)
+                products_wm = max(filter(None, (products_wm, _parse_ts(_max_ts(page)))))
+                n, c = self._score_and_write(client, todo, products_watermark=_max_ts(page))
+                scored, changed = scored + n, changed + c
+                done.update(p["id"] for p in todo)
+
+            # asset edits (keep_asset, file_url, ...) re-score their product
+            for page in changed_pages(client, "staging_assets", "id, staging_product_id, updated_at", self._since(assets_wm), self.batch_size):
+                seen = self._seen["staging_assets"]
+                fresh = [a for a in page if seen.get(a["id"]) != _parse_ts(a.get("updated_at"))]
+                skipped += len(page) - len(fresh)
+                seen.update((a["id"], _parse_ts(a.get("updated_at"))) for a in fresh)
+                ids = sorted({a["staging_product_id"] for a in fresh if a.get("staging_product_id")} - done)
+                products = select_in_chunks(client, "staging_products", SCORE_COLUMNS, "id", ids)
+                assets_wm = max(filter(None, (assets_wm, _parse_ts(_max_ts(page)))))
+                n, c = self._score_and_write(client, products, assets_watermark=_max_ts(page))
+                scored, changed = scored + n, changed + c
+                done.update(ids)
+
+            self._prune("staging_products", products_wm)
+            self._prune("staging_assets", assets_wm)
+            if changed:
+                invalidate_table("staging_products")
+            return {"scored": scored, "score_changes": changed, "skipped": skipped, "ms": (time.perf_counter() - t0) * 1000}
+
+
+if __name__ == "__main__":
+    from supabase_client import sb
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    scorer = CompletenessScorer(batch_size=int(os.getenv("SCORING_BATCH_SIZE", "1000")))
+    interval = float(os.getenv("SCORING_INTERVAL", "30"))
+    while True:
+        log.info("completeness pass: %s", scorer.run(sb()))
+        if "--once" in sys.argv:
+            break
+        time.sleep(interval)
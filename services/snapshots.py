@@ -0,0 +1,200 @@
+# services/snapshots.py
+"""
+Shared, columnar snapshots of the staging catalog for every session in the process.
+
+Snapshots are pandas DataFrames rebuilt from the change-feed mirrors
+(services/change_feed.py) only when a mirror's version moved. Only the first
+build blocks; after that a stale frame keeps being served while one background
+thread rebuilds, so an edit never stalls the sessions reading the frame. Pages
+then filter and page locally. Tables the feed only watches (over
+CATALOG_MIRROR_MAX_ROWS) have no snapshot; pages page from the server instead.
+"""
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from services.change_feed import TableMirror, change_feed
+
+log = logging.getLogger(__name__)
+
+# low-cardinality columns kept as pandas categoricals: filters compare integer
+# codes and groupbys/value_counts skip hashing strings
+CATEGORICAL_COLUMNS = ("manufacturer", "review_status", "severity", "asset_type", "content_category")
+# timestamptz columns parsed to datetime64[ns, UTC]: PostgREST and the change feed
+# spell the same instant differently ("+00:00" / "Z", 0-6 fraction digits), so
+# the strings do not sort or compare as times
+DATETIME_COLUMNS = ("created_at", "updated_at")
+
+
+def to_frame(rows, columns=None) -> pd.DataFrame:
+    """Load query results (list of dicts) straight into a columnar frame."""
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    for c in CATEGORICAL_COLUMNS:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+    for c in DATETIME_COLUMNS:
+        if c in df.columns:
+            df[c] = pd.to_datetime(df[c], utc=True, format="ISO8601")
+    return df
+
+
+def to_timestamp(v) -> pd.Timestamp:
+    """A timestamptz value (ISO string or datetime) as a UTC Timestamp; NaT for None."""
+    return pd.to_datetime(v, utc=True) if v else pd.NaT
+
+
+def _records(page: pd.DataFrame) -> list:
+    # rows in the server's shape: ISO strings for timestamps, None for missing values
+    page = page.astype(object).where(page.notna(), None)
+    for c in DATETIME_COLUMNS:
+        if c in page.columns:
+            page[c] = [t.isoformat() if t is not None else None for t in page[c]]
+    return page.to_dict("records")
+
+
+def value_counts(df: pd.DataFrame, column: str, blank: Optional[str] = "—") -> Dict[str, int]:
+    """Counts per value, largest first; nulls are folded into `blank` (dropped if None)."""
+    col = df[column]
+    if blank is not None:
+        if isinstance(col.dtype, pd.CategoricalDtype) and blank not in col.cat.categories:
+            col = col.cat.add_categories([blank])
+        col = col.fillna(blank)
+    counts = col.value_counts(sort=True)
+    return {k: int(v) for k, v in counts.items() if v}
+
+
+class Snapshot:
+    def __init__(self, mirror: TableMirror, columns: list):
+        self.mirror = mirror
+        self.columns = columns
+        self._df: Optional[pd.DataFrame] = None
+        self._version = -1
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self.builds = 0
+        self.build_ms = 0.0
+        self.nbytes = 0
+
+    @property
+    def ready(self) -> bool:
+        # a watch-only mirror holds recent changes, not the table
+        return self.mirror.loaded and self.mirror.complete
+
+    def _build(self):
+        t0 = time.perf_counter()
+        version = self.mirror.version
+        df = to_frame(self.mirror.snapshot(), columns=self.columns)
+        if "updated_at" in df.columns:
+            # keep the frame in page order so filtered slices need no sort
+            df = df.sort_values(["updated_at", "id"], ascending=False, ignore_index=True)
+        self._df, self._version = df, version
+        self.nbytes = int(df.memory_usage(deep=True).sum())  # deep=True walks every string; once per build
+        self.builds += 1
+        self.build_ms = (time.perf_counter() - t0) * 1000
+
+    def _rebuild(self):
+        # background: rebuild until the frame caught up with the mirror
+        while True:
+            ok = True
+            try:
+                self._build()
+            except Exception:
+                log.exception("snapshot: rebuilding %s failed", self.mirror.table)
+                ok = False
+            with self._lock:
+                if not ok or self._version == self.mirror.version:
+                    self._rebuilding = False
+                    return
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Current frame. The first call builds it (once, under a lock); later
+        calls return the last frame and, if the mirror moved since, start one
+        background rebuild.
+        """
+        df = self._df
+        if df is None:
+            with self._lock:
+                if self._df is None:
+                    self._build()
+                return self._df
+        if self._version != self.mirror.version:
+            with self._lock:
+                if not self._rebuilding:
+                    self._rebuilding = True
+                    threading.Thread(target=self._rebuild, daemon=True, name=f"snapshot-{self.mirror.table}").start()
+        return df
+
+    def memory_bytes(self) -> int:
+        return self.nbytes
+
+
+class CatalogSnapshots:
+    def __init__(self, feed):
+        self.feed = feed
+        self.products = Snapshot(feed.products, [c.strip() for c in feed.products.columns.split(",")])
+        self.assets = Snapshot(feed.assets, [c.strip() for c in feed.assets.columns.split(",")])
+
+    def wait_ready(self, client):
+        """Block until both mirrors finished their initial load (single fetch per process)."""
+        self.feed.products.ensure_loaded(client)
+        self.feed.assets.ensure_loaded(client)
+
+    def product_page(
+        self,
+        manufacturer: Optional[str] = None,
+        status: Optional[str] = None,
+        after=None,
+        page_size: int = 20,
+    ) -> Dict[str, Any]:
+        """Same contract as services.products.product_page (browse mode), served from the snapshot."""
+        df = self.products.frame()
+        mask = pd.Series(True, index=df.index)
+        if manufacturer:
+            mask &= df["manufacturer"] == manufacturer
+        if status:
+            mask &= df["review_status"] == status
+        total = int(mask.sum())
+        if after:
+            ts, rid = to_timestamp(after[0]), after[1]
+            mask &= (df["updated_at"] < ts) | ((df["updated_at"] == ts) & (df["id"] < rid))
+        # frame is already in (updated_at, id) desc order: take the first matches
+        # by position instead of copying every matching row first
+        page = df.iloc[mask.to_numpy().nonzero()[0][: page_size + 1]]
+        rows = _records(page)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        return {
+            "rows": rows,
+            "total": total,
+            "next": (rows[-1]["updated_at"], rows[-1]["id"]) if has_more else None,
+        }
+
+    def facets(self, column: str = "manufacturer") -> Dict[str, int]:
+        # same shape as services.products.manufacturer_facets: values are trimmed and
+        # blanks are not a facet. Counted per raw value first, then folded (few distinct values)
+        out: Dict[str, int] = {}
+        for value, n in value_counts(self.products.frame(), column, blank=None).items():
+            value = str(value).strip()
+            if value:
+                out[value] = out.get(value, 0) + n
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "products_rows": len(self.products._df) if self.products._df is not None else 0,
+            "assets_rows": len(self.assets._df) if self.assets._df is not None else 0,
+            "memory_bytes": self.products.memory_bytes() + self.assets.memory_bytes(),
+            "builds": self.products.builds + self.assets.builds,
+            "last_build_ms": max(self.products.build_ms, self.assets.build_ms),
+        }
+
+
+@lru_cache(maxsize=1)
+def catalog_snapshots() -> CatalogSnapshots:
+    """Process-wide snapshots over the process-wide change feed."""
+    return CatalogSnapshots(change_feed())
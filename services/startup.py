@@ -0,0 +1,125 @@
+# services/startup.py
+"""
+Web dyno entry point: `streamlit run` in this process, optionally pre-warmed.
+
+    web: python -m services.startup app.py --server.port $PORT --server.headless true
+
+Pages import the heavy SDKs (supabase, pandas/pyarrow, psycopg2) lazily, so
+without pre-warming the first session after a deploy pays for them. With
+STARTUP_PREWARM set, a background thread does that work while the server
+binds, in the same process the pages run in:
+
+    STARTUP_PREWARM=1 (or "all")   every step below
+    STARTUP_PREWARM=imports,client only the listed steps
+    unset / 0                      plain `streamlit run`
+
+Steps: imports (PREWARM_MODULES), client (sb()), catalog (change-feed
+mirrors and catalog snapshots), gl (GL pool, when GL_PG_DSN is set) and
+workers (in-process promotion workers, when PROMOTION_WORKERS_INPROCESS=1).
+Each step is logged and recorded as a "startup" sample in services/perf.py.
+"""
+import importlib
+import logging
+import os
+import sys
+import threading
+from typing import Callable, Dict, List
+
+from services import perf
+
+log = logging.getLogger(__name__)
+
+# what the first page render would otherwise import
+PREWARM_MODULES = ("supabase", "pandas", "pyarrow", "psycopg2.extras", "httpx")
+
+
+def _imports():
+    for name in PREWARM_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            log.warning("prewarm: %s is not installed", name)
+
+
+def _client():
+    from supabase_client import sb
+
+    sb()
+
+
+def _catalog():
+    from services.snapshots import catalog_snapshots
+    from supabase_client import sb
+
+    snaps = catalog_snapshots()
+    snaps.wait_ready(sb())
+    for snap in (snaps.products, snaps.assets):
+        if snap.ready:
+            snap.frame()
+
+
+def _gl():
+    if os.getenv("GL_PG_DSN"):
+        from services.gl_pool import gl_pool
+
+        gl_pool()
+
+
+def _workers():
+    from services.promotion_jobs import ensure_inprocess_workers
+
+    ensure_inprocess_workers()
+
+
+STEPS: Dict[str, Callable[[], None]] = {
+    "imports": _imports,
+    "client": _client,
+    "catalog": _catalog,
+    "gl": _gl,
+    "workers": _workers,
+}
+
+
+def prewarm_steps() -> List[str]:
+    """Steps selected by STARTUP_PREWARM, in STEPS order."""
+    raw = os.getenv("STARTUP_PREWARM", "").strip().lower()
+    if raw in ("", "0", "false", "no"):
+        return []
+    if raw in ("1", "true", "yes", "all"):
+        return list(STEPS)
+    wanted = {s.strip() for s in raw.split(",") if s.strip()}
+    unknown = wanted - set(STEPS)
+    if unknown:
+        raise RuntimeError(f"Unknown STARTUP_PREWARM step(s): {', '.join(sorted(unknown))} (known: {', '.join(STEPS)})")
+    return [s for s in STEPS if s in wanted]
+
+
+def prewarm(steps: List[str]):
+    """Run the steps in order; a failing step is logged and the rest still run."""
+    for name in steps:
+        try:
+            with perf.timed("startup", f"prewarm {name}", caller="services/startup.py") as s:
+                STEPS[name]()
+            log.info("prewarm %s: %.0f ms", name, s["ms"])
+        except Exception:
+            log.exception("prewarm %s failed", name)
+
+
+def start_prewarm() -> threading.Thread:
+    t = threading.Thread(target=prewarm, args=(prewarm_steps(),), daemon=True, name="prewarm")
+    t.start()
+    return t
+
+
+def main(argv: List[str]):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if prewarm_steps():
+        start_prewarm()
+    from streamlit.web import cli
+
+    sys.argv = ["streamlit", "run", *argv]
+    cli.main()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
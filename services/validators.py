@@ -1,10 +1,128 @@
 # services/validators.py
-from supabase import Client
+"""
+Field and asset-link checks for staging products.
+
+    python -m services.validators                   # sweep every asset link
+    python -m services.validators --product <id>    # one product (repeatable)
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from typing import TYPE_CHECKING, Iterable, List, Optional
+
+from services.link_check import RATE_LIMITED, check_urls
+from services.products import MAX_ROWS, id_pages, select_in_chunks
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+log = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ("product_name", "manufacturer", "description")
 
 def has_required_fields(prod: dict) -> bool:
-    req = ["product_name","manufacturer","description"]
-    return all((prod.get(k) not in (None,"")) for k in req)
+    return all((prod.get(k) not in (None,"")) for k in REQUIRED_FIELDS)
+
+def _broken(assets: List[dict], results: dict) -> List[dict]:
+    out = []
+    for a in assets:
+        r = results.get(a.get("file_url") or "")
+        if r and r["status"] == RATE_LIMITED:
+            continue  # the host asked us to slow down; unknown, not broken
+        if not a.get("file_url") or (r and not r["ok"]):
+            out.append({
+                "asset_id": a["id"],
+                "staging_product_id": a.get("staging_product_id"),
+                "file_url": a.get("file_url"),
+                "status": r["status"] if r else None,
+                "error": (r or {}).get("error") or ("missing URL" if not a.get("file_url") else None),
+            })
+    return out
+
+def broken_assets(client: Client, product_id: str, **check_kwargs) -> list:
+    """Assets of one product whose file_url is missing or does not resolve (HEAD check, cached)."""
+    assets = [
+        a
+        for page in id_pages(lambda: client.table("staging_assets").select("id, staging_product_id, file_url").eq("staging_product_id", product_id))
+        for a in page
+    ]
+    results = check_urls((a.get("file_url") for a in assets), **check_kwargs)
+    return _broken(assets, results)
+
+def log_broken_assets(client: Client, product_ids: List[str], broken: Iterable[dict]) -> int:
+    """
+    Replace the 'link_check' findings of `product_ids` with one error per broken
+    asset, in one rpc('replace_link_findings') (sql/013_link_check_findings.sql).
+    Products without broken assets lose their old findings. Returns rows written.
+    """
+    rows = [
+        {
+            "staging_product_id": b["staging_product_id"],
+            "severity": "error",
+            "message": f"broken asset link ({b['status'] or b['error']}): {b['file_url'] or b['asset_id']}",
+        }
+        for b in broken
+        if b.get("staging_product_id")
+    ]
+    if product_ids:
+        client.rpc("replace_link_findings", {"p_product_ids": product_ids, "p_rows": rows}).execute()
+    return len(rows)
+
+def sweep_asset_links(
+    client: Client,
+    product_ids: Optional[List[str]] = None,
+    page_size: int = MAX_ROWS,
+    progress=None,
+    **check_kwargs,
+) -> dict:
+    """
+    Check the file_url of every staging asset (or those of `product_ids`).
+    Products are walked in id-keyset pages of page_size; each page's assets are
+    read in full, checked concurrently, and the page's findings replaced before
+    the next page is read, so memory stays bounded by one page of products.
+    `progress(checked, broken)` is called after each page.
+    """
+    if product_ids:
+        ids = list(dict.fromkeys(product_ids))
+        pages = (ids[i:i + page_size] for i in range(0, len(ids), page_size))
+    else:
+        pages = ([p["id"] for p in page] for page in id_pages(lambda: client.table("staging_products").select("id"), page_size))
+
+    checked = broken_total = 0
+    for pids in pages:
+        assets = select_in_chunks(client, "staging_assets", "id, staging_product_id, file_url", "staging_product_id", pids)
+        results = check_urls((a.get("file_url") for a in assets), **check_kwargs)
+        broken_total += log_broken_assets(client, pids, _broken(assets, results))
+        checked += len(assets)
+        if progress:
+            progress(checked, broken_total)
+    return {"checked": checked, "broken": broken_total}
+
+
+def main(argv: List[str]):
+    ap = argparse.ArgumentParser(description="Check staging asset links and log broken ones (rule 'link_check').")
+    ap.add_argument("--product", action="append", dest="products", metavar="ID", help="only this product (repeatable)")
+    ap.add_argument("--concurrency", type=int, default=100, help="requests in flight")
+    ap.add_argument("--per-host", type=int, default=4, help="requests in flight per host")
+    ap.add_argument("--per-host-interval", type=float, default=0.2, help="seconds between requests to one host")
+    ap.add_argument("--page-size", type=int, default=MAX_ROWS, help="products per page")
+    args = ap.parse_args(argv)
+
+    from supabase_client import sb
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    t0 = time.perf_counter()
+    res = sweep_asset_links(
+        sb(), args.products, args.page_size,
+        progress=lambda checked, broken: log.info("%s assets checked, %s broken", f"{checked:,}", f"{broken:,}"),
+        concurrency=args.concurrency, per_host=args.per_host, per_host_interval=args.per_host_interval,
+    )
+    log.info("link sweep: %s assets, %s broken, %.0fs", f"{res['checked']:,}", f"{res['broken']:,}", time.perf_counter() - t0)
+    return 0
+
 
-def broken_assets(client: Client, product_id: str) -> list:
-    # Placeholder: you can add a HEAD request validator later
-    return []
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,49 @@
+-- sql/001_dashboard_metrics.sql
+-- Server-side aggregation for the Dashboard KPIs.
+-- Exposed to the app through PostgREST as rpc('dashboard_metrics').
+
+create index if not exists staging_products_review_status_idx
+    on public.staging_products (review_status);
+create index if not exists staging_products_manufacturer_idx
+    on public.staging_products (manufacturer);
+create index if not exists staging_assets_keep_promoted_idx
+    on public.staging_assets (keep_asset, promoted_to_gl);
+create index if not exists staging_validation_log_severity_idx
+    on public.staging_validation_log (severity);
+
+create or replace function public.dashboard_metrics()
+returns jsonb
+language sql
+stable
+as $$
+    select jsonb_build_object(
+        'total_products', (select count(*) from public.staging_products),
+        'review_status', coalesce((
+            select jsonb_object_agg(status, n)
+            from (
+                select review_status as status, count(*) as n
+                from public.staging_products
+                where review_status is not null
+                group by 1
+            ) s
+        ), '{}'::jsonb),
+        'assets', (
+            select jsonb_build_object(
+                'kept', count(*) filter (where keep_asset),
+                'promoted', count(*) filter (where promoted_to_gl)
+            )
+            from public.staging_assets
+        ),
+        'severity', coalesce((
+            select jsonb_object_agg(severity, n)
+            from (
+                select severity, count(*) as n
+                from public.staging_validation_log
+                where severity is not null
+                group by 1
+            ) s
+        ), '{}'::jsonb)
+    );
+$$;
+
+grant execute on function public.dashboard_metrics() to service_role;
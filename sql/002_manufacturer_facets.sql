@@ -0,0 +1,22 @@
+-- sql/002_manufacturer_facets.sql
+-- Distinct manufacturers with counts for the Products filter dropdown.
+-- Exposed as rpc('manufacturer_facets'); the app re-calls it only when
+-- max(updated_at) moves past the watermark it last saw.
+
+-- serves the max(updated_at) probe and the (updated_at, id) keyset order of product_page
+create index if not exists staging_products_updated_at_id_idx
+    on public.staging_products (updated_at desc, id desc);
+
+create or replace function public.manufacturer_facets()
+returns table (manufacturer text, n bigint)
+language sql
+stable
+as $$
+    select trim(manufacturer) as manufacturer, count(*) as n
+    from public.staging_products
+    where nullif(trim(manufacturer), '') is not null
+    group by 1
+    order by 1;
+$$;
+
+grant execute on function public.manufacturer_facets() to service_role;
@@ -0,0 +1,75 @@
+-- sql/003_product_search.sql
+-- Indexed, ranked product search with prefix matching.
+-- Replaces the product_name/description ILIKE scan; exposed as rpc('search_products').
+
+create extension if not exists pg_trgm;
+
+alter table public.staging_products
+    add column if not exists search_tsv tsvector
+    generated always as (
+        setweight(to_tsvector('simple', coalesce(product_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(manufacturer, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) stored;
+
+create index if not exists staging_products_search_tsv_idx
+    on public.staging_products using gin (search_tsv);
+-- typo-tolerant name matches (product_name % query)
+create index if not exists staging_products_name_trgm_idx
+    on public.staging_products using gin (product_name gin_trgm_ops);
+
+-- "acme ster" -> 'acme':* & 'ster':*
+create or replace function public.products_tsquery(p_query text)
+returns tsquery
+language sql
+immutable
+as $$
+    select to_tsquery('simple', string_agg(w || ':*', ' & '))
+    from regexp_split_to_table(lower(coalesce(p_query, '')), '[^[:alnum:]]+') as w
+    where w <> '';
+$$;
+
+-- Ranked matches, keyset-paged on (rank, id): pass the last row's rank/id to get the next page.
+create or replace function public.search_products(
+    p_query text,
+    p_manufacturer text default null,
+    p_status text default null,
+    p_after_rank real default null,
+    p_after_id uuid default null,
+    p_limit int default 21
+)
+returns table (
+    id uuid,
+    product_name text,
+    manufacturer text,
+    category text,
+    completeness_score int,
+    review_status text,
+    created_at timestamptz,
+    updated_at timestamptz,
+    rank real
+)
+language sql
+stable
+as $$
+    with q as (
+        select public.products_tsquery(p_query) as tsq
+    ),
+    hits as (
+        select p.id, p.product_name, p.manufacturer, p.category, p.completeness_score,
+               p.review_status, p.created_at, p.updated_at,
+               (coalesce(ts_rank(p.search_tsv, q.tsq), 0) + similarity(p.product_name, p_query))::real as rank
+        from public.staging_products p, q
+        where (p.search_tsv @@ q.tsq or p.product_name % p_query)
+          and (p_manufacturer is null or p.manufacturer = p_manufacturer)
+          and (p_status is null or p.review_status = p_status)
+    )
+    select *
+    from hits
+    where p_after_rank is null or (hits.rank, hits.id) < (p_after_rank, p_after_id)
+    order by hits.rank desc, hits.id desc
+    limit p_limit;
+$$;
+
+grant execute on function public.products_tsquery(text) to service_role;
+grant execute on function public.search_products(text, text, text, real, uuid, int) to service_role;
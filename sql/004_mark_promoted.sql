@@ -0,0 +1,26 @@
+-- sql/004_mark_promoted.sql
+-- Set-based write-back after a Global Library promotion.
+-- One rpc('mark_promoted') call flags every promoted staging asset and product.
+-- Rows are typed through jsonb_populate_recordset, so gl ids arrive in the
+-- column's own type and no other column is touched.
+
+create or replace function public.mark_promoted(p_products jsonb, p_assets jsonb)
+returns void
+language sql
+volatile
+as $$
+    update public.staging_assets a
+       set promoted_to_gl = true,
+           gl_asset_id = x.gl_asset_id
+      from jsonb_populate_recordset(null::public.staging_assets, coalesce(p_assets, '[]'::jsonb)) x
+     where a.id = x.id;
+
+    update public.staging_products p
+       set promoted_to_gl = true,
+           gl_product_id = x.gl_product_id,
+           promoted_at = x.promoted_at
+      from jsonb_populate_recordset(null::public.staging_products, coalesce(p_products, '[]'::jsonb)) x
+     where p.id = x.id;
+$$;
+
+grant execute on function public.mark_promoted(jsonb, jsonb) to service_role;
@@ -0,0 +1,70 @@
+-- sql/005_promotion_queue.sql
+-- staging_promotion_log doubles as a durable promotion job queue.
+-- promotion_status: queued -> running -> success | failed (queued again while retries remain).
+-- Workers: services/promotion_jobs.py (Procfile `worker`).
+
+alter table public.staging_promotion_log
+    add column if not exists idempotency_key text,
+    add column if not exists attempts int not null default 0,
+    add column if not exists max_attempts int not null default 3,
+    add column if not exists next_attempt_at timestamptz not null default now(),
+    add column if not exists locked_by text,
+    add column if not exists locked_at timestamptz,
+    add column if not exists updated_at timestamptz not null default now();
+
+-- one job per (product, version); enqueueing the same version twice is a no-op
+create unique index if not exists staging_promotion_log_idempotency_key_idx
+    on public.staging_promotion_log (idempotency_key);
+create index if not exists staging_promotion_log_queue_idx
+    on public.staging_promotion_log (next_attempt_at)
+    where promotion_status in ('queued', 'running');
+create index if not exists staging_promotion_log_product_idx
+    on public.staging_promotion_log (staging_product_id, created_at desc);
+
+-- Atomically lease up to p_limit due jobs. Jobs left 'running' past the lease
+-- (worker died mid-promotion) are handed out again.
+create or replace function public.claim_promotion_jobs(
+    p_worker text,
+    p_limit int default 5,
+    p_lease_seconds int default 600
+)
+returns setof public.staging_promotion_log
+language sql
+volatile
+as $$
+    update public.staging_promotion_log l
+       set promotion_status = 'running',
+           locked_by = p_worker,
+           locked_at = now(),
+           attempts = l.attempts + 1,
+           updated_at = now()
+     where l.id in (
+            select j.id
+              from public.staging_promotion_log j
+             where (j.promotion_status = 'queued' and j.next_attempt_at <= now())
+                or (j.promotion_status = 'running' and j.locked_at < now() - make_interval(secs => p_lease_seconds))
+             order by j.next_attempt_at
+             limit p_limit
+             for update skip locked
+           )
+    returning l.*;
+$$;
+
+-- Job counts for the Dashboard: everything still open plus the last 24h of results.
+create or replace function public.promotion_queue_counts()
+returns jsonb
+language sql
+stable
+as $$
+    select coalesce(jsonb_object_agg(promotion_status, n), '{}'::jsonb)
+    from (
+        select promotion_status, count(*) as n
+        from public.staging_promotion_log
+        where idempotency_key is not null
+          and (promotion_status in ('queued', 'running') or updated_at > now() - interval '24 hours')
+        group by 1
+    ) s;
+$$;
+
+grant execute on function public.claim_promotion_jobs(text, int, int) to service_role;
+grant execute on function public.promotion_queue_counts() to service_role;
@@ -0,0 +1,58 @@
+-- sql/006_bulk_review.sql
+-- Bulk review actions from the Products browser: one rpc('bulk_update_products')
+-- updates many staging_products and records an audit row per changed field.
+
+create table if not exists public.staging_review_audit (
+    id bigint generated always as identity primary key,
+    staging_product_id uuid not null,
+    field text not null,
+    old_value jsonb,
+    new_value jsonb,
+    changed_by text,
+    changed_at timestamptz not null default now()
+);
+
+create index if not exists staging_review_audit_product_idx
+    on public.staging_review_audit (staging_product_id, changed_at desc);
+
+create or replace function public.bulk_update_products(
+    p_ids uuid[],
+    p_fields jsonb,
+    p_actor text default 'curator'
+)
+returns int
+language plpgsql
+volatile
+as $$
+declare
+    n int;
+begin
+    if exists (
+        select 1 from jsonb_object_keys(p_fields) k
+        where k not in ('review_status', 'manufacturer', 'category', 'regulatory_status')
+    ) then
+        raise exception 'bulk_update_products: unsupported field in %', p_fields;
+    end if;
+
+    insert into public.staging_review_audit (staging_product_id, field, old_value, new_value, changed_by)
+    select p.id, f.key, to_jsonb(p) -> f.key, f.value, p_actor
+    from public.staging_products p
+    cross join jsonb_each(p_fields) f
+    where p.id = any(p_ids)
+      and (to_jsonb(p) -> f.key) is distinct from f.value;
+
+    update public.staging_products p
+       set review_status     = case when p_fields ? 'review_status'     then p_fields ->> 'review_status'     else p.review_status end,
+           manufacturer      = case when p_fields ? 'manufacturer'      then p_fields ->> 'manufacturer'      else p.manufacturer end,
+           category          = case when p_fields ? 'category'          then p_fields ->> 'category'          else p.category end,
+           regulatory_status = case when p_fields ? 'regulatory_status' then p_fields ->> 'regulatory_status' else p.regulatory_status end,
+           updated_at        = now()
+     where p.id = any(p_ids);
+
+    get diagnostics n = row_count;
+    return n;
+end;
+$$;
+
+grant select, insert on public.staging_review_audit to service_role;
+grant execute on function public.bulk_update_products(uuid[], jsonb, text) to service_role;
@@ -0,0 +1,24 @@
+-- sql/007_bulk_update_assets.sql
+-- Commit every edited asset row of the Product Editor grid in one call.
+-- p_rows: [{"id": ..., "keep_asset": ..., "content_category": ...}, ...]
+
+create or replace function public.bulk_update_assets(p_rows jsonb)
+returns int
+language plpgsql
+volatile
+as $$
+declare
+    n int;
+begin
+    update public.staging_assets a
+       set keep_asset = x.keep_asset,
+           content_category = x.content_category
+      from jsonb_populate_recordset(null::public.staging_assets, coalesce(p_rows, '[]'::jsonb)) x
+     where a.id = x.id;
+
+    get diagnostics n = row_count;
+    return n;
+end;
+$$;
+
+grant execute on function public.bulk_update_assets(jsonb) to service_role;
@@ -0,0 +1,30 @@
+-- sql/008_change_feed.sql
+-- updated_at watermarks for the in-process change feed (services/change_feed.py).
+-- Every write to staging_products / staging_assets bumps updated_at, including
+-- RPC writes (mark_promoted, bulk_update_assets) that do not set it themselves.
+
+alter table public.staging_assets
+    add column if not exists updated_at timestamptz not null default now();
+
+create or replace function public.touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := now();
+    return new;
+end;
+$$;
+
+drop trigger if exists staging_products_touch_updated_at on public.staging_products;
+create trigger staging_products_touch_updated_at
+    before update on public.staging_products
+    for each row execute function public.touch_updated_at();
+
+drop trigger if exists staging_assets_touch_updated_at on public.staging_assets;
+create trigger staging_assets_touch_updated_at
+    before update on public.staging_assets
+    for each row execute function public.touch_updated_at();
+
+create index if not exists staging_assets_updated_at_id_idx
+    on public.staging_assets (updated_at, id);
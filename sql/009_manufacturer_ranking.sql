@@ -0,0 +1,39 @@
+-- sql/009_manufacturer_ranking.sql
+-- Ordered top-N manufacturers by product count, optionally within one review
+-- status, with everything below the cut folded into a single 'Other' row.
+-- Exposed as rpc('manufacturer_ranking'); only N + 1 rows leave the database.
+
+-- lets the per-status drill-down group from the index alone
+create index if not exists staging_products_review_status_manufacturer_idx
+    on public.staging_products (review_status, manufacturer);
+
+create or replace function public.manufacturer_ranking(
+    p_limit integer default 10,
+    p_status text default null
+)
+returns table (rank integer, manufacturer text, n bigint)
+language sql
+stable
+as $$
+    with counts as (
+        select coalesce(nullif(trim(manufacturer), ''), '—') as m, count(*) as n
+        from public.staging_products
+        where p_status is null or review_status = p_status
+        group by 1
+    ),
+    ranked as (
+        select m, n, row_number() over (order by n desc, m) as r
+        from counts
+    )
+    select r::integer, m, n
+    from ranked
+    where r <= greatest(p_limit, 1)
+    union all
+    select null, 'Other', sum(n)::bigint
+    from ranked
+    where r > greatest(p_limit, 1)
+    having count(*) > 0
+    order by 1 nulls last;
+$$;
+
+grant execute on function public.manufacturer_ranking(integer, text) to service_role;
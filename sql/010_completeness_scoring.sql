@@ -0,0 +1,66 @@
+-- sql/010_completeness_scoring.sql
+-- Storage for the incremental completeness scorer (services/scoring.py).
+-- The scorer reads products/assets whose updated_at moved past its stored
+-- watermarks and writes each batch back with rpc('apply_completeness_scores'):
+-- scores, the product's 'completeness' findings and the new watermarks commit
+-- together, so a crashed run resumes from its last finished batch.
+
+create table if not exists public.staging_scoring_state (
+    engine text primary key,
+    products_watermark timestamptz,
+    assets_watermark timestamptz,
+    updated_at timestamptz not null default now()
+);
+
+-- findings written by an engine carry its rule name so they can be replaced
+-- without touching manually or link-check logged rows
+alter table public.staging_validation_log
+    add column if not exists rule text;
+
+create index if not exists staging_validation_log_rule_product_idx
+    on public.staging_validation_log (rule, staging_product_id);
+
+-- p_rows: [{"id": ..., "completeness_score": 80, "findings": [{"severity": ..., "message": ...}]}, ...]
+-- Returns the products whose score actually changed, with their new updated_at.
+create or replace function public.apply_completeness_scores(
+    p_rows jsonb,
+    p_products_watermark timestamptz default null,
+    p_assets_watermark timestamptz default null
+)
+returns table (scored_id uuid, scored_updated_at timestamptz)
+language plpgsql
+volatile
+as $$
+begin
+    delete from public.staging_validation_log l
+     using jsonb_to_recordset(coalesce(p_rows, '[]'::jsonb)) x(id uuid)
+     where l.rule = 'completeness'
+       and l.staging_product_id = x.id;
+
+    insert into public.staging_validation_log (staging_product_id, severity, message, rule)
+    select (r->>'id')::uuid, f->>'severity', f->>'message', 'completeness'
+      from jsonb_array_elements(coalesce(p_rows, '[]'::jsonb)) r,
+           jsonb_array_elements(coalesce(r->'findings', '[]'::jsonb)) f;
+
+    insert into public.staging_scoring_state as s (engine, products_watermark, assets_watermark)
+    values ('completeness', p_products_watermark, p_assets_watermark)
+    on conflict (engine) do update
+       set products_watermark = greatest(s.products_watermark, excluded.products_watermark),
+           assets_watermark = greatest(s.assets_watermark, excluded.assets_watermark),
+           updated_at = now();
+
+    -- unchanged scores are not rewritten, so they do not bump updated_at
+    for scored_id, scored_updated_at in
+        update public.staging_products p
+           set completeness_score = x.completeness_score
+          from jsonb_to_recordset(coalesce(p_rows, '[]'::jsonb)) x(id uuid, completeness_score int)
+         where p.id = x.id
+           and p.completeness_score is distinct from x.completeness_score
+        returning p.id, p.updated_at
+    loop
+        return next;
+    end loop;
+end;
+$$;
+
+grant execute on function public.apply_completeness_scores(jsonb, timestamptz, timestamptz) to service_role;
@@ -0,0 +1,67 @@
+-- sql/011_catalog_import.sql
+-- Bulk catalog import (services/catalog_io.py): one rpc('import_staging_products') per batch.
+-- p_rows:    [{"id": ..., <p_columns>...}, ...], already coerced and validated client-side
+-- p_columns: the file's columns; only these are written
+-- Rows whose id exists are updated, and only when a value actually differs, so
+-- re-importing an unchanged export does not bump updated_at (change feed, scorer).
+-- Rows without an id, or with an id not in the table, are inserted.
+
+create or replace function public.import_staging_products(p_rows jsonb, p_columns text[])
+returns table (inserted int, updated int, unchanged int)
+language plpgsql
+volatile
+as $$
+declare
+    allowed constant text[] := array[
+        'product_name', 'manufacturer', 'category', 'description', 'indications', 'contraindications',
+        'regulatory_status', 'review_status', 'source_urls', 'source_page_ids', 'active_ingredients'
+    ];
+    cols text[] := array(select c from unnest(p_columns) c where c <> 'id');
+    target text;
+    source text;
+    current text;
+    matched int;
+begin
+    if cardinality(cols) = 0 or exists (select 1 from unnest(cols) c where c <> all(allowed)) then
+        raise exception 'import_staging_products: unsupported columns %', p_columns;
+    end if;
+
+    select string_agg(format('%I', c), ', '),
+           string_agg(format('x.%I', c), ', '),
+           string_agg(format('p.%I', c), ', ')
+      into target, source, current
+      from unnest(cols) c;
+
+    execute
+        'select count(*)
+           from jsonb_populate_recordset(null::public.staging_products, $1) x
+           join public.staging_products p on p.id = x.id'
+       into matched
+      using coalesce(p_rows, '[]'::jsonb);
+
+    execute format(
+        'update public.staging_products p
+            set (%1$s) = row(%2$s)
+           from jsonb_populate_recordset(null::public.staging_products, $1) x
+          where p.id = x.id
+            and row(%3$s) is distinct from row(%2$s)',
+        target, source, current)
+      using coalesce(p_rows, '[]'::jsonb);
+    get diagnostics updated = row_count;
+
+    execute format(
+        'insert into public.staging_products (id, %1$s)
+         select coalesce(x.id, gen_random_uuid()), %2$s
+           from jsonb_populate_recordset(null::public.staging_products, $1) x
+          where x.id is null
+             or not exists (select 1 from public.staging_products p where p.id = x.id)',
+        target, source)
+      using coalesce(p_rows, '[]'::jsonb);
+    get diagnostics inserted = row_count;
+
+    unchanged := matched - updated;
+    return next;
+end;
+$$;
+
+grant execute on function public.import_staging_products(jsonb, text[]) to service_role;
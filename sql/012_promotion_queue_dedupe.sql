@@ -0,0 +1,50 @@
+-- sql/012_promotion_queue_dedupe.sql
+-- One active promotion job per staging product, whatever its version.
+-- Keying jobs on (product, updated_at) let an edit or a scorer write between two
+-- enqueues open a second live job, and two workers could lease and promote both.
+-- Enqueueing goes through rpc('enqueue_promotion_jobs') (services/promotion_jobs.py).
+
+-- close all but the oldest active job of a product, so the index below can build
+update public.staging_promotion_log l
+   set promotion_status = 'failed',
+       error_message = 'superseded by an older active job for this product',
+       locked_by = null,
+       locked_at = null,
+       updated_at = now()
+ where l.promotion_status in ('queued', 'running')
+   and exists (
+        select 1
+          from public.staging_promotion_log o
+         where o.staging_product_id = l.staging_product_id
+           and o.promotion_status in ('queued', 'running')
+           and (o.created_at, o.id) < (l.created_at, l.id)
+       );
+
+create unique index if not exists staging_promotion_log_active_product_idx
+    on public.staging_promotion_log (staging_product_id)
+    where promotion_status in ('queued', 'running');
+
+-- keys stay as a marker of queue jobs (promotion_queue_counts), no longer unique
+drop index if exists public.staging_promotion_log_idempotency_key_idx;
+
+-- Queue a job for every existing product in p_ids that has no active job.
+-- Returns the jobs created; products already queued or running keep their job.
+create or replace function public.enqueue_promotion_jobs(
+    p_ids uuid[],
+    p_promoted_by text default 'curator',
+    p_max_attempts int default 3
+)
+returns setof public.staging_promotion_log
+language sql
+volatile
+as $$
+    insert into public.staging_promotion_log
+           (staging_product_id, promoted_by, promotion_status, idempotency_key, max_attempts)
+    select p.id, p_promoted_by, 'queued', 'promote:' || p.id, p_max_attempts
+      from public.staging_products p
+     where p.id = any(p_ids)
+    on conflict (staging_product_id) where promotion_status in ('queued', 'running') do nothing
+    returning *;
+$$;
+
+grant execute on function public.enqueue_promotion_jobs(uuid[], text, int) to service_role;
@@ -0,0 +1,36 @@
+-- sql/013_link_check_findings.sql
+-- Broken-link findings of the asset link sweep (services/validators.py), tagged
+-- rule = 'link_check' and replaced per product on every sweep, the way
+-- apply_completeness_scores() replaces 'completeness' findings, so repeated
+-- sweeps do not pile up Dashboard errors.
+
+-- rows logged before rules existed
+update public.staging_validation_log
+   set rule = 'link_check'
+ where rule is null
+   and message like 'broken asset link (%';
+
+-- p_product_ids: every product checked in this batch (clean ones lose their old findings)
+-- p_rows: [{"staging_product_id": ..., "severity": ..., "message": ...}, ...]
+create or replace function public.replace_link_findings(p_product_ids uuid[], p_rows jsonb)
+returns int
+language plpgsql
+volatile
+as $$
+declare
+    n int;
+begin
+    delete from public.staging_validation_log
+     where rule = 'link_check'
+       and staging_product_id = any(p_product_ids);
+
+    insert into public.staging_validation_log (staging_product_id, severity, message, rule)
+    select x.staging_product_id, x.severity, x.message, 'link_check'
+      from jsonb_to_recordset(coalesce(p_rows, '[]'::jsonb)) x(staging_product_id uuid, severity text, message text)
+     where x.staging_product_id = any(p_product_ids);
+    get diagnostics n = row_count;
+    return n;
+end;
+$$;
+
+grant execute on function public.replace_link_findings(uuid[], jsonb) to service_role;
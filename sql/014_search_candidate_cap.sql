@@ -0,0 +1,97 @@
+-- sql/014_search_candidate_cap.sql
+-- Bound the work of rpc('search_products') on broad queries.
+-- ts_rank and similarity ran on every match before ORDER BY ... LIMIT, so a
+-- short prefix such as "prod" ranked nearly the whole table. Ranking now covers
+-- at most p_max_candidates recent matches plus a name shortlist:
+--   * recent: matches newest first; broad queries walk the (updated_at desc,
+--     id desc) index from sql/002 and stop after p_max_candidates, rare terms
+--     still come from the GIN indexes and rank every match
+--   * named: products whose name equals or starts with the query, from the
+--     prefix index below, so the best matches survive the recency cut
+-- Every row carries `truncated`: true when the recent set was cut, i.e. older
+-- matches outside the name shortlist were not ranked.
+
+drop function if exists public.search_products(text, text, text, real, uuid, int);
+drop function if exists public.search_products(text, text, text, real, uuid, int, int);
+
+-- serves lower(product_name) = q and lower(product_name) like 'q%'
+create index if not exists staging_products_name_prefix_idx
+    on public.staging_products (lower(product_name) text_pattern_ops);
+
+-- Ranked matches, keyset-paged on (rank, id): pass the last row's rank/id to get the next page.
+create or replace function public.search_products(
+    p_query text,
+    p_manufacturer text default null,
+    p_status text default null,
+    p_after_rank real default null,
+    p_after_id uuid default null,
+    p_limit int default 21,
+    p_max_candidates int default 1000
+)
+returns table (
+    id uuid,
+    product_name text,
+    manufacturer text,
+    category text,
+    completeness_score int,
+    review_status text,
+    created_at timestamptz,
+    updated_at timestamptz,
+    rank real,
+    truncated boolean
+)
+language plpgsql
+stable
+-- plan each call with its own arguments: which of the plans above is cheap
+-- depends on how many rows the query matches
+set plan_cache_mode = force_custom_plan
+as $$
+#variable_conflict use_column
+begin
+    return query
+    with recent as (
+        select p.id
+        from public.staging_products p
+        where (p.search_tsv @@ public.products_tsquery(p_query) or p.product_name % p_query)
+          and (p_manufacturer is null or p.manufacturer = p_manufacturer)
+          and (p_status is null or p.review_status = p_status)
+        order by p.updated_at desc, p.id desc
+        limit p_max_candidates + 1
+    ),
+    named as (
+        (select p.id
+         from public.staging_products p
+         where lower(p.product_name) = lower(p_query)
+           and (p_manufacturer is null or p.manufacturer = p_manufacturer)
+           and (p_status is null or p.review_status = p_status)
+         limit p_max_candidates)
+        union
+        (select p.id
+         from public.staging_products p
+         where lower(p.product_name) like replace(replace(replace(lower(p_query), '\', '\\'), '%', '\%'), '_', '\_') || '%'
+           and (p_manufacturer is null or p.manufacturer = p_manufacturer)
+           and (p_status is null or p.review_status = p_status)
+         limit p_max_candidates)
+    ),
+    candidates as (
+        (select r.id from recent r limit p_max_candidates)
+        union
+        select n.id from named n
+    ),
+    hits as (
+        select p.id, p.product_name, p.manufacturer, p.category, p.completeness_score,
+               p.review_status, p.created_at, p.updated_at,
+               (coalesce(ts_rank(p.search_tsv, public.products_tsquery(p_query)), 0)
+                + similarity(p.product_name, p_query))::real as rank
+        from candidates c
+        join public.staging_products p on p.id = c.id
+    )
+    select h.*, (select count(*) from recent) > p_max_candidates
+    from hits h
+    where p_after_rank is null or (h.rank, h.id) < (p_after_rank, p_after_id)
+    order by h.rank desc, h.id desc
+    limit p_limit;
+end;
+$$;
+
+grant execute on function public.search_products(text, text, text, real, uuid, int, int) to service_role;
@@ -0,0 +1,12 @@
+-- sql/015_per_product_indexes.sql
+-- Per-product lookups on the child tables: the asset grid and link check
+-- (Product_Detail, services/validators.py), promote_batch / select_in_chunks,
+-- the completeness scorer and catalog export all filter staging_assets or
+-- staging_validation_log by staging_product_id. Without these they scan the
+-- table, and so does every delete cascade from staging_products.
+
+create index if not exists staging_assets_product_idx
+    on public.staging_assets (staging_product_id);
+
+create index if not exists staging_validation_log_product_idx
+    on public.staging_validation_log (staging_product_id);
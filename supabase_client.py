@@ -1,26 +1,50 @@
 import os
 from functools import lru_cache
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict
 
 from dotenv import load_dotenv
-from supabase import create_client, Client
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 load_dotenv()
 
 # ---- STRICT: Service-role only ----
-_SUPABASE_URL = os.getenv("SUPABASE_URL", "").strip()
-_SR_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "").strip()
-
-if not _SUPABASE_URL or not _SR_KEY:
-    raise RuntimeError(
-        "Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in .env. "
-        "This app is configured to use ONLY the service-role key."
-    )
-
+# Checked on first sb() call rather than at import: the SDK import and the
+# client are deferred until a page actually queries (see services/startup.py).
 @lru_cache(maxsize=1)
-def sb() -> Client:
-    """Singleton Supabase client using the service-role key (bypasses RLS)."""
-    return create_client(_SUPABASE_URL, _SR_KEY)
+def sb() -> "Client":
+    """Singleton Supabase client using the service-role key (bypasses RLS), timed by services/perf.py."""
+    url = os.getenv("SUPABASE_URL", "").strip()
+    key = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "").strip()
+    if not url or not key:
+        raise RuntimeError(
+            "Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in .env. "
+            "This app is configured to use ONLY the service-role key."
+        )
+    from supabase import create_client
+
+    from services.perf import instrument
+
+    return instrument(create_client(url, key))
+
+def session_sb():
+    """
+    Per-Streamlit-session CachedClient over sb() (services/query_cache.py).
+    Identical selects on reruns are served from memory; writes through any
+    cached client, and the service functions that write through RPCs (bulk
+    edits, import, scoring, mark_promoted), invalidate that table for every
+    session of this process.
+    Invalidation is process-local: writes made by another process (the
+    promotion `worker`, another app replica, SQL) show up here only once the
+    cached read expires, i.e. up to `ttl` (30 s) late.
+    """
+    import streamlit as st
+    from services.query_cache import CachedClient
+
+    if "_sb_cached" not in st.session_state:
+        st.session_state["_sb_cached"] = CachedClient(sb(), ttl=30, maxsize=256)
+    return st.session_state["_sb_cached"]
 
 # ----------------- helpers -----------------
 
@@ -34,22 +58,18 @@ def _to_array(v):
         return parts
     return v
 
-def update_staging_product(product_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+ARRAY_COLUMNS = ("source_urls", "source_page_ids", "active_ingredients")
+
+def coerce_fields(fields: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Update a staging_products row by id.
-    - Coerces commas->arrays for source_urls, source_page_ids, active_ingredients
-    - Converts empty strings to NULL
-    - Bumps updated_at from client (ISO) to avoid extra SQL deps
-    - Propagates errors so Streamlit shows them
+    staging_products field values as the table expects them (editor and bulk import):
+    - Commas->arrays for ARRAY_COLUMNS
+    - Empty strings -> NULL
     """
-    from datetime import datetime, timezone
-
-    client = sb()
-
     payload = dict(fields)
 
     # Coerce arrays from text areas
-    for k in ("source_urls", "source_page_ids", "active_ingredients"):
+    for k in ARRAY_COLUMNS:
         if k in payload:
             payload[k] = _to_array(payload[k])
 
@@ -58,6 +78,22 @@ def update_staging_product(product_id: str, fields: Dict[str, Any]) -> Dict[str,
         if isinstance(v, str) and v.strip() == "":
             payload[k] = None
 
+    return payload
+
+def update_staging_product(product_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Update a staging_products row by id.
+    - Coerces commas->arrays for source_urls, source_page_ids, active_ingredients
+    - Converts empty strings to NULL
+    - Bumps updated_at from client (ISO) to avoid extra SQL deps
+    - Propagates errors so Streamlit shows them
+    """
+    from datetime import datetime, timezone
+    from services.query_cache import invalidate_table
+
+    client = sb()
+
+    payload = coerce_fields(fields)
     payload["updated_at"] = datetime.now(timezone.utc).isoformat()
 
     res = (
@@ -67,6 +103,8 @@ def update_staging_product(product_id: str, fields: Dict[str, Any]) -> Dict[str,
         .execute()
     )
 
+    invalidate_table("staging_products")
+
     if not getattr(res, "data", None):
         raise RuntimeError("Update returned no data. Check payload types or table RLS.")
 
@@ -1,6 +1,35 @@
 # utils/pdf.py
+"""
+PDF previews for asset rows.
+
+pdf_thumbnail() renders the first page of a remote PDF to a PNG, reading the
+document through HTTP byte ranges (only the blocks PDFium asks for: trailer,
+xref and the first page's objects) instead of downloading the whole file.
+Thumbnails are kept in a size-bounded disk cache shared by every session, so
+re-opening a product costs no further downloads.
+"""
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Optional
+
 import streamlit as st
 
+if TYPE_CHECKING:
+    import httpx
+
+log = logging.getLogger(__name__)
+
+BLOCK_SIZE = 64 * 1024
+MAX_FULL_DOWNLOAD = 50 * 1024 * 1024  # hosts that ignore Range: give up beyond this
+FAILURE_TTL = 300.0  # seconds a URL that failed to render is not fetched again
+
+
 def pdf_iframe(url: str, height: int = 600):
     # Renders a PDF inline if the host allows embedding. Otherwise shows link.
     st.components.v1.html(
@@ -9,3 +38,243 @@ def pdf_iframe(url: str, height: int = 600):
         """,
         height=height+8,
     )
+
+
+def is_pdf_asset(asset: dict) -> bool:
+    """Asset row that looks like a PDF (type, file name or URL path) and has a URL."""
+    if not asset.get("file_url"):
+        return False
+    if (asset.get("asset_type") or "").lower() == "pdf":
+        return True
+    name = (asset.get("file_name") or asset["file_url"].split("?", 1)[0]).lower()
+    return name.endswith(".pdf")
+
+
+class RangeReader(io.RawIOBase):
+    """
+    Seekable read-only file over an HTTP URL, fetched in BLOCK_SIZE ranges.
+    Falls back to one full download when the host does not honour Range.
+    """
+
+    def __init__(self, url: str, http: "httpx.Client"):
+        self.url = url
+        self.http = http
+        self.pos = 0
+        self.blocks: Dict[int, bytes] = {}
+        self.bytes_fetched = 0
+        self.size = self._probe()
+
+    def _probe(self) -> int:
+        # streamed: a host that ignores Range sends the whole file, and it must
+        # not be read into memory before the MAX_FULL_DOWNLOAD check
+        with self.http.stream("GET", self.url, headers={"Range": f"bytes=0-{BLOCK_SIZE - 1}"}) as r:
+            r.raise_for_status()
+            if r.status_code == 206 and "/" in r.headers.get("content-range", ""):
+                body = r.read()
+                self.blocks[0] = body
+                self.bytes_fetched += len(body)
+                return int(r.headers["content-range"].rsplit("/", 1)[1])
+            # 200: the whole body is coming
+            too_big = ValueError(f"{self.url}: no range support and larger than {MAX_FULL_DOWNLOAD} bytes")
+            if int(r.headers.get("content-length") or 0) > MAX_FULL_DOWNLOAD:
+                raise too_big
+            body = bytearray()
+            for chunk in r.iter_bytes(BLOCK_SIZE):
+                body += chunk
+                self.bytes_fetched += len(chunk)
+                if len(body) > MAX_FULL_DOWNLOAD:
+                    raise too_big
+        for i in range(0, len(body), BLOCK_SIZE):
+            self.blocks[i // BLOCK_SIZE] = bytes(body[i:i + BLOCK_SIZE])
+        return len(body)
+
+    def _block(self, n: int) -> bytes:
+        if n not in self.blocks:
+            start = n * BLOCK_SIZE
+            end = min(start + BLOCK_SIZE, self.size) - 1
+            r = self.http.get(self.url, headers={"Range": f"bytes={start}-{end}"})
+            r.raise_for_status()
+            if r.status_code != 206:
+                raise ValueError(f"{self.url}: range request answered with {r.status_code}")
+            self.blocks[n] = r.content
+            self.bytes_fetched += len(r.content)
+        return self.blocks[n]
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.pos, io.SEEK_END: self.size}[whence]
+        self.pos = max(0, base + offset)
+        return self.pos
+
+    def readinto(self, b) -> int:
+        view = memoryview(b).cast("B")
+        n = 0
+        while n < len(view) and self.pos < self.size:
+            block = self._block(self.pos // BLOCK_SIZE)
+            off = self.pos % BLOCK_SIZE
+            chunk = block[off:off + len(view) - n]
+            if not chunk:
+                break
+            view[n:n + len(chunk)] = chunk
+            n += len(chunk)
+            self.pos += len(chunk)
+        return n
+
+
+class PreviewCache:
+    """
+    PNG thumbnails on disk, keyed by (url, width).
+    - Bounded by `max_bytes`: least recently used files are evicted first
+      (mtime is bumped on every hit)
+    - One render per key at a time; concurrent sessions wait for it
+    - Keys that failed to render are remembered for FAILURE_TTL seconds, so a
+      broken URL is not fetched again on every visit
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._failed: Dict[str, float] = {}  # key -> monotonic expiry
+        self._guard = threading.Lock()
+        self.hits = self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".png")
+
+    def _lock(self, key: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _release(self, key: str):
+        # rendered (or failed): later callers find the file or the failure, not the lock
+        with self._guard:
+            self._locks.pop(key, None)
+
+    def _count(self, hit: bool):
+        with self._guard:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def failed(self, key: str) -> bool:
+        with self._guard:
+            expiry = self._failed.get(key)
+            if expiry is not None and expiry <= time.monotonic():
+                del self._failed[key]
+                expiry = None
+            return expiry is not None
+
+    def put_failure(self, key: str):
+        now = time.monotonic()
+        with self._guard:
+            for k in [k for k, t in self._failed.items() if t <= now]:
+                del self._failed[k]
+            self._failed[key] = now + FAILURE_TTL
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # evicted by another render since the read; the bytes are still good
+        return data
+
+    def put(self, key: str, data: bytes):
+        tmp = self._path(key) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for e in os.scandir(self.directory):
+            if e.name.endswith(".png"):
+                st_ = e.stat()
+                entries.append((st_.st_mtime, st_.st_size, e.path))
+        total = sum(s for _, s, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        files = [e.stat().st_size for e in os.scandir(self.directory) if e.name.endswith(".png")]
+        return {"files": len(files), "bytes": sum(files), "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+
+@lru_cache(maxsize=1)
+def preview_cache() -> PreviewCache:
+    """Process-wide cache (PDF_PREVIEW_DIR, PDF_PREVIEW_CACHE_MB)."""
+    directory = os.getenv("PDF_PREVIEW_DIR") or os.path.join(tempfile.gettempdir(), "pdf-previews")
+    return PreviewCache(directory, int(os.getenv("PDF_PREVIEW_CACHE_MB", "256")) * 1024 * 1024)
+
+
+def render_first_page(reader: io.RawIOBase, width: int) -> bytes:
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(reader)
+    try:
+        page = pdf[0]
+        image = page.render(scale=width / page.get_width()).to_pil()
+        out = io.BytesIO()
+        image.save(out, format="PNG", optimize=True)
+        return out.getvalue()
+    finally:
+        pdf.close()
+
+
+def pdf_thumbnail(url: str, width: int = 480, timeout: float = 15.0) -> Optional[bytes]:
+    """First page of the PDF at `url` as PNG bytes, from the disk cache when possible; None if it cannot be rendered."""
+    cache = preview_cache()
+    key = hashlib.sha1(f"{url}|{width}".encode()).hexdigest()
+    data = cache.get(key)
+    if data is not None:
+        cache._count(hit=True)
+        return data
+    if cache.failed(key):
+        return None
+    try:
+        with cache._lock(key):
+            data = cache.get(key)  # rendered by another session while we waited
+            if data is not None:
+                cache._count(hit=True)
+                return data
+            if cache.failed(key):
+                return None
+            cache._count(hit=False)
+            import httpx
+
+            try:
+                with httpx.Client(timeout=timeout, follow_redirects=True) as http:
+                    reader = RangeReader(url, http)
+                    data = render_first_page(reader, width)
+                log.info("rendered %s from %d of %d bytes", url, reader.bytes_fetched, reader.size)
+            except Exception as e:
+                log.warning("pdf preview failed for %s: %s", url, e)
+                cache.put_failure(key)
+                return None
+            cache.put(key, data)
+            return data
+    finally:
+        cache._release(key)